@@ -1,6 +1,6 @@
 import google.generativeai as genai
 from dotenv import load_dotenv
-import json
+import orjson
 import os
 
 load_dotenv()
@@ -152,10 +152,10 @@ Extract all data as flat JSON."""
             response_text += ']' * open_brackets
         
         # Parse JSON
-        data: dict = json.loads(response_text)
+        data: dict = orjson.loads(response_text)
         return data
     
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         print(f"JSON decode error: {e}")
         print(f"Response text: {response_text}")
         raise ValueError(f"Failed to parse LLM response as JSON: {str(e)}")
@@ -182,10 +182,10 @@ def fill_html_form(
     prompt = f"""Template Language: {template_lang}
 
 Form Fields:
-{json.dumps(form_fields_map, indent=2)}
+{orjson.dumps(form_fields_map, option=orjson.OPT_INDENT_2).decode()}
 
 Entity Data:
-{json.dumps(entity_data, indent=2)}
+{orjson.dumps(entity_data, option=orjson.OPT_INDENT_2).decode()}
 
 Fill form fields using entity data. Return JSON only."""
     
@@ -212,7 +212,7 @@ Fill form fields using entity data. Return JSON only."""
             response_text = response_text[4:].strip()
         
         # Parse JSON
-        filled_form: dict = json.loads(response_text)
+        filled_form: dict = orjson.loads(response_text)
         print(f"[DEBUG] Entity data received: {entity_data}")
         print(f"[DEBUG] Form fields to fill: {list(form_fields_map.keys())}")
         print(f"[DEBUG] Filled form result: {filled_form}")
@@ -224,7 +224,7 @@ Fill form fields using entity data. Return JSON only."""
         
         return filled_form
     
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         print(f"JSON decode error: {e}")
         print(f"Response text: {response_text}")
         raise ValueError(f"Failed to parse LLM response as JSON: {str(e)}")
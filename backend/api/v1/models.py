@@ -1,3 +1,5 @@
+from typing import List
+
 from pydantic import BaseModel
 
 class User(BaseModel):
@@ -5,4 +7,8 @@ class User(BaseModel):
     username: str
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+
+class EntityBulkCreate(BaseModel):
+    names: List[str]
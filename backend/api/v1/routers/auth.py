@@ -1,12 +1,18 @@
-from datetime import datetime, timedelta
+from datetime import timedelta
+import functools
 import hashlib
+import secrets
+import time
 from typing import Optional
 
 import bcrypt
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials, OAuth2PasswordRequestForm
-from jose import JWTError, jwt
+import jwt
+from jwt import PyJWTError
 from passlib.context import CryptContext
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from pathlib import Path
@@ -16,14 +22,15 @@ import sys
 backend_dir = Path(__file__).parent.parent.parent.parent
 sys.path.insert(0, str(backend_dir))
 
-from database.base import get_db
+from database.base import get_db, get_async_db
 from database.repository import UserRepository
 from database.models import User
+from config import settings
 
-# Configuration
-SECRET_KEY = ""  # Should load from env
-ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 30
+# Configuration, read once; the signing key is encoded up front rather than per token
+SECRET_KEY = settings.SECRET_KEY.encode("utf-8")
+ALGORITHM = settings.ALGORITHM
+ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 
 router = APIRouter(tags=["Authentication"])
 
@@ -52,8 +59,8 @@ def bcrypt_hash(password: str) -> bytes:
     # Step 1: normalize + hash to fixed length
     sha = hashlib.sha256(password.encode("utf-8")).digest()
 
-    # Step 2: bcrypt hash
-    return bcrypt.hashpw(sha, bcrypt.gensalt())
+    # Step 2: bcrypt hash (cost is tunable per deployment; existing hashes keep theirs)
+    return bcrypt.hashpw(sha, bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS))
 
 def verify_password(plain_password: str, hashed_password: bytes) -> bool:
     sha = hashlib.sha256(plain_password.encode("utf-8")).digest()
@@ -62,17 +69,28 @@ def verify_password(plain_password: str, hashed_password: bytes) -> bool:
 def get_password_hash(password):
     return bcrypt_hash(password)
 
+@functools.lru_cache(maxsize=1)
+def _dummy_password_hash() -> bytes:
+    # Checked against when the username doesn't exist, so an unknown user costs
+    # the same bcrypt work as a wrong password and can't be told apart by timing
+    return bcrypt_hash(secrets.token_hex(16))
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=15)
-    to_encode.update({"exp": expire})
+    if expires_delta is None:
+        expires_delta = timedelta(minutes=15)
+    # "exp" is a NumericDate; set it as epoch seconds directly rather than via a datetime
+    to_encode["exp"] = int(time.time() + expires_delta.total_seconds())
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme), db: Session = Depends(get_db)):
+@functools.lru_cache(maxsize=4096)
+def _decode_access_token(token: str) -> dict:
+    # A SPA reuses one bearer token for many requests, so verified payloads are kept.
+    # Only successful decodes are cached (exceptions aren't); callers re-check "exp".
+    return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM], options={"require": ["exp"]})
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme), db: AsyncSession = Depends(get_async_db)):
     token = credentials.credentials if credentials else None
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -82,21 +100,26 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(b
     if not token:
         raise credentials_exception
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = _decode_access_token(token)
+        if payload["exp"] <= time.time():
+            raise credentials_exception
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
-    except JWTError:
+    except PyJWTError:
         raise credentials_exception
-    user = UserRepository.get_by_username(db, username=username)
+    user = await UserRepository.get_by_username_async(db, username=username)
     if user is None:
         raise credentials_exception
     return user
 
 @router.post("/login", response_model=Token)
-async def login_for_access_token(user: UserCreate, db: Session = Depends(get_db)):
-    db_user = UserRepository.get_by_username(db, username=user.username)
-    if not db_user or not verify_password(user.password, db_user.hashed_password):
+async def login_for_access_token(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    db_user = await UserRepository.get_by_username_async(db, username=user.username)
+    hashed_password = db_user.hashed_password if db_user else _dummy_password_hash()
+    # bcrypt is deliberately slow; keep it off the event loop so other requests aren't stalled
+    password_ok = await run_in_threadpool(verify_password, user.password, hashed_password)
+    if not db_user or not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -110,8 +133,7 @@ async def login_for_access_token(user: UserCreate, db: Session = Depends(get_db)
 
 @router.post("/signup", response_model=UserResponse)
 def create_user(user: UserCreate, db: Session = Depends(get_db)):
-    db_user = UserRepository.get_by_username(db, username=user.username)
-    if db_user:
+    if UserRepository.username_exists(db, username=user.username):
         raise HTTPException(status_code=400, detail="Username already registered")
     hashed_password = get_password_hash(user.password)
     return UserRepository.create(db=db, username=user.username, hashed_password=hashed_password)
@@ -1,24 +1,24 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from pathlib import Path
+import hashlib
 import sys
 import os
 
+import orjson
+
 # Add backend directory to Python path
 backend_dir = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(backend_dir))
 
 from database.session import get_db, Session
 from database.repository import EntityRepository
-from api.v1.models import User
+from api.v1.models import EntityBulkCreate, User
 from api.v1.routers.auth import get_current_user
 from config import settings
 
 router = APIRouter(tags=["entities"])
 
-from config import settings
-import os
-
 def _attach_documents(entity, user_id: int):
     """Helper to attach documents from filesystem to entity dict."""
     if not entity:
@@ -48,16 +48,31 @@ def _attach_documents(entity, user_id: int):
 
 @router.get("/")
 async def list_entities(
+    request: Request,
     limit: int = 100,
     offset: int = 0,
+    after_id: Optional[int] = None,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     """
     List entities with pagination.
+    
+    Pass the id of the last entity received as `after_id` to fetch the next
+    page; `offset` is still accepted but gets slower the deeper it pages.
+    
+    The response carries an ETag of its body; polling clients that send it back
+    in If-None-Match get an empty 304 while the page is unchanged.
     """
-    entities = EntityRepository.get_by_user(db, current_user.id, skip=offset, limit=limit)
-    return [_attach_documents(e, current_user.id) for e in entities]
+    entities = EntityRepository.get_by_user(
+        db, current_user.id, skip=offset, limit=limit, after_id=after_id
+    )
+    body = orjson.dumps([_attach_documents(e, current_user.id) for e in entities])
+    etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+    
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
 
 
 @router.get("/{entity_id}")
@@ -92,6 +107,19 @@ async def create_entity(
     return EntityRepository.create(db, current_user.id, entity_name)
 
 
+@router.post("/bulk", status_code=status.HTTP_201_CREATED)
+async def create_entities_bulk(
+    payload: EntityBulkCreate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Create many entities at once, e.g. for imports.
+    """
+    created = EntityRepository.create_many(db, current_user.id, payload.names)
+    return {"created": created}
+
+
 @router.put("/{entity_id}")
 async def update_entity(
     entity_id: int,
@@ -1,7 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import HTMLResponse, FileResponse
-import requests
-import json
+import orjson
 from pathlib import Path
 import sys
 
@@ -12,6 +11,7 @@ from database.session import Session, get_db
 from database.repository import ExtractedDataRepository, TemplateRepository
 from api.v1.routers.auth import get_current_user
 from config import settings
+from src.services.http_session import http_session
 from src.services.template_processing.html_parser import fill_html_template, validate_field_data
 
 router = APIRouter(tags=["Form Fill"])
@@ -39,7 +39,7 @@ def form_fill(
     # Parse form_fields if they are JSON strings
     if isinstance(template_data.form_fields, str):
         try:
-            form_fields_map = json.loads(template_data.form_fields)
+            form_fields_map = orjson.loads(template_data.form_fields)
         except Exception:
             form_fields_map = {}
     else:
@@ -77,8 +77,8 @@ def form_fill(
         raw = extracted_record.extracted_toon_object
         if isinstance(raw, str):
             try:
-                entity_data = json.loads(raw)
-            except json.JSONDecodeError:
+                entity_data = orjson.loads(raw)
+            except orjson.JSONDecodeError:
                 entity_data = parse_toon_data(raw)
         else:
             entity_data = raw
@@ -95,7 +95,7 @@ def form_fill(
         filled_form_data = {key: "" for key in form_fields_map.keys()}
     else:
         try:
-            response = requests.post(
+            response = http_session.post(
                 url=f"{settings.AGENTS_API_ENDPOINT}/fill-form/",
                 json={
                     "form_fields_map": form_fields_map,
@@ -104,7 +104,7 @@ async def create_template(
     template = TemplateRepository.create(
         db=db,
         user_id=user.id,
-        path=str(file_path),
+        template_path=str(file_path),
         file_hash=file_hash,
         name=file.filename,
         lang=lang or 'en',
@@ -112,6 +112,12 @@ async def create_template(
         form_fields=form_fields,
         html_structure=html_structure
     )
+    if template is None or template.template_path != str(file_path):
+        # A concurrent upload stored this hash first; the file written above is unused
+        if file_path.exists():
+            os.remove(file_path)
+    if template is None:
+        raise HTTPException(status_code=409, detail="A template with this file already exists.")
     return {"template": template.__dict__}
 
 
@@ -175,18 +181,16 @@ async def update_template(
             raise HTTPException(status_code=400, detail=f"Failed to parse HTML template: {str(e)}")
 
     # Update DB record
-    import json
     template.file_hash = file_hash
     template.template_path = file_path
-    template.form_fields = json.dumps(form_fields) if isinstance(form_fields, dict) else form_fields
-    template.html_structure = json.dumps(html_structure) if isinstance(html_structure, dict) else html_structure
+    template.form_fields = form_fields
+    template.html_structure = html_structure
     template.template_type = 'html'
     
     if lang is not None:
         template.lang = lang
     
     db.commit()
-    db.refresh(template)
     return {"template": template.__dict__}
 
 
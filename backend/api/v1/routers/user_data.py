@@ -1,8 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from dotenv import load_dotenv
 import hashlib
+import os
 from pathlib import Path
 import sys
+import tempfile
 
 # Add backend directory to Python path
 backend_dir = Path(__file__).parent.parent.parent
@@ -19,8 +22,31 @@ load_dotenv()
 
 router = APIRouter(tags=["entities-data"])
 
-def generate_file_hash(file_content: bytes) -> str:
-    return hashlib.sha256(file_content).hexdigest()
+# Uploads are copied to disk in chunks of this size
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def save_upload(file: UploadFile, directory: Path) -> tuple[Path, str]:
+    """
+    Stream an upload chunk by chunk into a new hidden part file in `directory`.
+    
+    Every call gets its own part file, so concurrent uploads of the same filename
+    don't write over each other.
+    
+    Returns:
+        The part file's path and the upload's SHA-256 hex digest
+    """
+    sha256 = hashlib.sha256()
+    with tempfile.NamedTemporaryFile(dir=directory, prefix=".", suffix=".part", delete=False) as out:
+        try:
+            for chunk in iter(lambda: file.file.read(UPLOAD_CHUNK_SIZE), b""):
+                sha256.update(chunk)
+                out.write(chunk)
+        except BaseException:
+            out.close()
+            os.unlink(out.name)
+            raise
+    return Path(out.name), sha256.hexdigest()
 
 @router.get("/")
 async def list_entity_data(
@@ -44,39 +70,49 @@ async def create_entity_data(
     Create or update extracted data record for an entity.
     Data is merged into a single consolidated record per entity.
     """
-    file_content = await file.read()
-    file_hash = generate_file_hash(file_content)
-
-    # Check if this file has already been processed for this entity
-    if ExtractedDataRepository.is_file_processed(db, entity_id, file_hash):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Extracted data with this file already exists."
-        )
-    
-    # Store file 
-    try:
-        # object_path = settings.ENTITY_DATA_STORAGE.upload_file(
-        #                     user_id=current_user.id,
-        #                     entity_id=entity_id,
-        #                     file_data=file.file,
-        #                     file_name=file.filename
-        #                 )
+    upload_dir = Path(settings.UPLOAD_FILE_PATH) / f"{current_user.id}" / f"{entity_id}"
+    upload_dir.mkdir(parents=True, exist_ok=True)
+    file_path = upload_dir / f"{file.filename}"
 
-        # file_path = settings.ENTITY_DATA_STORAGE.get_file_path(object_path)
+    # Hash while streaming to a hidden part file, so the upload is never held in memory;
+    # the blocking reads and writes run off the event loop
+    part_path, file_hash = await run_in_threadpool(save_upload, file, upload_dir)
+
+    try:
+        # Check if this file has already been processed for this entity
+        if ExtractedDataRepository.is_file_processed(db, entity_id, file_hash):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Extracted data with this file already exists."
+            )
+        
+        # Store file 
+        try:
+            # object_path = settings.ENTITY_DATA_STORAGE.upload_file(
+            #                     user_id=current_user.id,
+            #                     entity_id=entity_id,
+            #                     file_data=file.file,
+            #                     file_name=file.filename
+            #                 )
 
-        file_path = Path(settings.UPLOAD_FILE_PATH) / f"{current_user.id}" / f"{entity_id}" / f"{file.filename}"
-        file_path.parent.mkdir(parents=True, exist_ok=True)
+            # file_path = settings.ENTITY_DATA_STORAGE.get_file_path(object_path)
 
-        with open(file_path, "wb") as f:
-            f.write(file_content)
+            part_path.replace(file_path)
 
-        extraction_status = extract_and_save_organize_data(db, current_user.id, entity_id, file_path, lang=lang)
+            # OCR and the agent call block for seconds to minutes; run them off the
+            # event loop so other requests keep being served meanwhile
+            extraction_status = await run_in_threadpool(
+                extract_and_save_organize_data,
+                db, current_user.id, entity_id, file_path, lang=lang, file_hash=file_hash
+            )
 
-        return {"status": extraction_status}
+            return {"status": extraction_status}
 
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Error uploading file to storage."
-        )
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Error uploading file to storage."
+            )
+    finally:
+        # Left behind only if the upload wasn't moved into place
+        part_path.unlink(missing_ok=True)
@@ -1,4 +1,5 @@
 from dotenv import load_dotenv
+from functools import lru_cache
 import os
 # from src.services.storage.minio_service import MinioService
 
@@ -12,6 +13,7 @@ class Settings:
     SECRET_KEY: str = os.getenv("SECRET_KEY", "supersecretkey")
     ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
     UPLOAD_FILE_PATH: str = os.getenv("UPLOAD_FILE_PATH", "./uploads")
     OUTPUT_FILE_PATH: str = os.getenv("OUTPUT_FILE_PATH", "./outputs")
     AGENTS_API_ENDPOINT: str = os.getenv("AGENTS_API_ENDPOINT", "http://localhost:8907/agent")
@@ -29,7 +31,13 @@ class Settings:
     #     bucket_name=MINIO_BUCKET_NAME
     # )
 
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the process-wide Settings instance, built on first use."""
+    return Settings()
+
+
+settings = get_settings()
 # settings.ENTITY_DATA_STORAGE.ensure_bucket_exists("user-data")
 # settings.TEMPLATE_STORAGE.ensure_bucket_exists("templates")
 os.makedirs(settings.UPLOAD_FILE_PATH, exist_ok=True)
\ No newline at end of file
@@ -3,7 +3,7 @@ Database package for AI-Powered Form Filling application.
 
 This package provides database models and utilities using SQLAlchemy ORM.
 """
-from .base import Base, engine, get_db, init_db, SessionLocal
+from .base import Base, engine, get_db, init_db, SessionLocal, get_async_engine, get_async_db, AsyncSessionLocal
 from .models import User, Entity, Template, ExtractedData
 
 __all__ = [
@@ -12,6 +12,9 @@ __all__ = [
     "get_db",
     "init_db",
     "SessionLocal",
+    "get_async_engine",
+    "get_async_db",
+    "AsyncSessionLocal",
     "User",
     "Entity",
     "Template",
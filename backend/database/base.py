@@ -1,8 +1,11 @@
 import os
-from typing import Generator
+from functools import lru_cache
+from typing import AsyncGenerator, Generator
 
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import URL, create_engine, make_url
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
 from pathlib import Path
 import sys
@@ -20,16 +23,107 @@ class Base(DeclarativeBase):
     pass
 
 
+def is_sqlite(url: str) -> bool:
+    """Whether the database URL points at SQLite (matched on the backend, not a substring)."""
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def is_sqlite_memory(url: str) -> bool:
+    """Whether the database URL is an in-memory SQLite database."""
+    return is_sqlite(url) and make_url(url).database in (None, "", ":memory:")
+
+
+# In-memory SQLite is opened as a named shared-cache database, so the sync and
+# async engines (which never share a connection) see the same tables
+SHARED_MEMORY_DATABASE = "file:form_filling"
+SHARED_MEMORY_QUERY = {"mode": "memory", "cache": "shared", "uri": "true"}
+
+
+def database_url(url: str) -> URL:
+    """The URL the sync engine connects to."""
+    if is_sqlite_memory(url):
+        return make_url(url).set(database=SHARED_MEMORY_DATABASE, query=SHARED_MEMORY_QUERY)
+    return make_url(url)
+
+
+# asyncio drivers used when DATABASE_URL names a sync driver
+ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "postgresql": "asyncpg",
+}
+
+
+def async_database_url(url: str) -> URL:
+    """Map DATABASE_URL onto the matching asyncio driver (e.g. postgresql+psycopg2 -> postgresql+asyncpg)."""
+    url = database_url(url)
+    if url.get_dialect().is_async:
+        return url
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(
+            f"No asyncio driver is configured for '{url.drivername}'. "
+            f"Use an async driver in DATABASE_URL, e.g. '{backend}+<async driver>://...'."
+        )
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+
+
+def engine_options(url: str) -> dict:
+    """
+    Backend specific create_engine() options.
+    
+    Only SQLite gets check_same_thread=False: FastAPI may open, use and close a
+    request's session on different threadpool threads. An in-memory database
+    lives on a single connection, so it is pinned with StaticPool.
+    """
+    if not is_sqlite(url):
+        return {}
+    options = {"connect_args": {"check_same_thread": False}}
+    if is_sqlite_memory(url):
+        options["poolclass"] = StaticPool
+    return options
+
+
+# Compiled SQL kept per engine; larger than the default 500 so every query
+# shape the app and scripts use stays cached
+QUERY_CACHE_SIZE = 1200
+
 # Create database engine
 # DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./app.db")
 engine = create_engine(
-    settings.DATABASE_URL,
+    database_url(settings.DATABASE_URL),
     echo=True,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
+    pool_pre_ping=True,
+    pool_recycle=1800,
+    query_cache_size=QUERY_CACHE_SIZE,
+    **engine_options(settings.DATABASE_URL)
 )
 
 # Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+
+# Async session factory; bound to the async engine when that is first created
+AsyncSessionLocal = async_sessionmaker(autoflush=False, expire_on_commit=False)
+
+
+@lru_cache(maxsize=1)
+def get_async_engine() -> AsyncEngine:
+    """
+    Async engine for request handlers running on the event loop.
+    
+    Created on first use rather than at import, so scripts and the sync code
+    paths don't need an asyncio driver installed.
+    """
+    async_engine = create_async_engine(
+        async_database_url(settings.DATABASE_URL),
+        echo=True,
+        pool_pre_ping=True,
+        pool_recycle=1800,
+        query_cache_size=QUERY_CACHE_SIZE,
+        **({} if is_sqlite(settings.DATABASE_URL) else {"pool_size": 20, "max_overflow": 30})
+    )
+    AsyncSessionLocal.configure(bind=async_engine)
+    return async_engine
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -46,6 +140,18 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency function to get an async database session.
+    
+    Yields:
+        AsyncSession: SQLAlchemy async database session
+    """
+    get_async_engine()
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def init_db() -> None:
     """
     Initialize database by creating all tables.
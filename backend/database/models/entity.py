@@ -1,6 +1,7 @@
 from typing import List, Optional, TYPE_CHECKING
 
-from sqlalchemy import ForeignKey, JSON, String, Text
+from sqlalchemy import ForeignKey, Index, JSON, String, Text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from ..base import Base
@@ -22,6 +23,12 @@ class Entity(Base):
         doc_path: Path to the document
     """
     __tablename__ = "entities"
+    __table_args__ = (
+        # Lookups of a user's entity by name
+        Index("ix_entities_user_id_name", "user_id", "name"),
+        # A user's entity listing, read in id order
+        Index("ix_entities_user_id_id", "user_id", "id"),
+    )
     
     # Primary Key
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
@@ -31,7 +38,8 @@ class Entity(Base):
     
     # Fields
     name: Mapped[str] = mapped_column(String(255), nullable=False)
-    entity_metadata: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+    # Binary JSONB on PostgreSQL (parsed once on write, indexable); plain JSON elsewhere
+    entity_metadata: Mapped[Optional[dict]] = mapped_column(JSON().with_variant(JSONB(), "postgresql"), nullable=True)
     doc_path: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     
     # Relationships
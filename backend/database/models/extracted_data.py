@@ -1,9 +1,10 @@
 from typing import Optional, List, TYPE_CHECKING
 
-from sqlalchemy import ForeignKey, JSON, Integer, String
+from sqlalchemy import ForeignKey, Identity, JSON, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from ..base import Base
+from ..types import CompressedJSON
 
 if TYPE_CHECKING:
     from .user import User
@@ -22,12 +23,14 @@ class ExtractedData(Base):
         entity_id: Foreign key to Entity (unique - one record per entity)
         status: Status of extraction (1=success, 0=pending/failed)
         processed_file_hashes: JSON list of file hashes that have been processed
-        extracted_toon_object: JSON object containing merged extracted data
+        extracted_toon_object: Gzipped JSON object containing merged extracted data
     """
     __tablename__ = "extracted_data"
     
     # Primary Key
-    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    # Identity with a cached sequence so bulk ingestion doesn't hit the sequence per row
+    # (rendered on PostgreSQL; SQLite keeps its rowid autoincrement)
+    id: Mapped[int] = mapped_column(Identity(start=1, cycle=False, cache=50), primary_key=True)
     
     # Foreign Keys
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -36,7 +39,7 @@ class ExtractedData(Base):
     # Fields
     status: Mapped[int] = mapped_column(Integer, default=0, nullable=False)  # 1=success, 0=pending/failed
     processed_file_hashes: Mapped[Optional[List[str]]] = mapped_column(JSON, nullable=True, default=list)  # List of processed file hashes
-    extracted_toon_object: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+    extracted_toon_object: Mapped[Optional[dict]] = mapped_column(CompressedJSON, nullable=True)
     
     # Relationships
     entity: Mapped["Entity"] = relationship("Entity", back_populates="extracted_data")
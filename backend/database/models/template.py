@@ -1,10 +1,11 @@
 from typing import Optional, TYPE_CHECKING
 from sqlalchemy import ForeignKey
 import datetime
-from sqlalchemy import String, Text
+from sqlalchemy import DateTime, String, Text, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from ..base import Base
+from ..types import CompressedJSON
 
 if TYPE_CHECKING:
     from .user import User
@@ -25,6 +26,8 @@ class Template(Base):
         html_structure: Parsed HTML structure with field mappings
     """
     __tablename__ = "templates"
+    # Fetch server-generated defaults (created_at) via INSERT ... RETURNING
+    __mapper_args__ = {"eager_defaults": True}
     
     # Primary Key
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
@@ -35,9 +38,17 @@ class Template(Base):
     file_hash: Mapped[str] = mapped_column(String(64), unique=True, nullable=False, index=True)
     lang: Mapped[Optional[str]] = mapped_column(String(10), nullable=True)
     template_type: Mapped[str] = mapped_column(String(10), default='html', nullable=False)  # 'html' or 'pdf'
-    form_fields: Mapped[Optional[dict]] = mapped_column(Text, nullable=True)  # JSON stored as text
-    html_structure: Mapped[Optional[dict]] = mapped_column(Text, nullable=True)  # Parsed HTML structure
-    created_at: Mapped[datetime.datetime] = mapped_column(default=datetime.datetime.now(datetime.timezone.utc), nullable=False)
+    form_fields: Mapped[Optional[dict]] = mapped_column(CompressedJSON, nullable=True)  # Gzipped JSON
+    html_structure: Mapped[Optional[dict]] = mapped_column(CompressedJSON, nullable=True)  # Parsed HTML structure
+    # Stamped in Python, since tables created before the server default was added
+    # have a NOT NULL created_at with no database default; server_default covers
+    # rows inserted outside the ORM on newly created tables
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.datetime.now(datetime.timezone.utc),
+        server_default=func.now(),
+        nullable=False
+    )
     
     # Foreign key to user
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
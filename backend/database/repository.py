@@ -1,31 +1,89 @@
+import functools
 from typing import List, Optional
 
+from sqlalchemy import bindparam, exists, insert, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from .models import User, Entity, Template, ExtractedData
 
+# Dialects whose INSERT supports ON CONFLICT DO NOTHING ... RETURNING
+_UPSERT_INSERTS = {
+    "postgresql": pg_insert,
+    "sqlite": sqlite_insert,
+}
+
+# Attempts for a repository write when the connection drops mid-transaction
+WRITE_ATTEMPTS = 2
+
+
+def _retry_on_disconnect(func):
+    """Re-run a repository write after a transient OperationalError.
+    
+    The whole write is repeated rather than just commit(): rolling back
+    discards the pending changes, so they have to be applied again.
+    """
+    @functools.wraps(func)
+    def wrapper(db: Session, *args, **kwargs):
+        for attempt in range(1, WRITE_ATTEMPTS + 1):
+            try:
+                return func(db, *args, **kwargs)
+            except OperationalError:
+                db.rollback()
+                if attempt == WRITE_ATTEMPTS:
+                    raise
+    return wrapper
+
+
+# Lookup statements are built once and reused with bound parameters
+_user_by_id_stmt = select(User).where(User.id == bindparam("user_id"))
+_user_by_username_stmt = select(User).where(User.username == bindparam("username"))
+_username_exists_stmt = select(exists().where(User.username == bindparam("username")))
+_entity_by_id_stmt = select(Entity).where(Entity.id == bindparam("entity_id"))
+_template_by_id_stmt = select(Template).where(Template.id == bindparam("template_id"))
+_template_by_hash_stmt = select(Template).where(Template.file_hash == bindparam("file_hash"))
+_extracted_data_by_id_stmt = select(ExtractedData).where(ExtractedData.id == bindparam("extracted_data_id"))
+_extracted_data_by_entity_stmt = select(ExtractedData).where(ExtractedData.entity_id == bindparam("entity_id"))
+_processed_hashes_by_entity_stmt = select(ExtractedData.processed_file_hashes).where(
+    ExtractedData.entity_id == bindparam("entity_id")
+)
+
 
 class UserRepository:
     """Repository for User model operations."""
     
     @staticmethod
+    @_retry_on_disconnect
     def create(db: Session, username: str, hashed_password: str) -> User:
         """Create a new user."""
         user = User(username=username, hashed_password=hashed_password)
         db.add(user)
         db.commit()
-        db.refresh(user)
         return user
     
     @staticmethod
     def get_by_id(db: Session, user_id: int) -> Optional[User]:
         """Get user by ID."""
-        return db.query(User).filter(User.id == user_id).first()
+        return db.execute(_user_by_id_stmt, {"user_id": user_id}).scalar_one_or_none()
     
     @staticmethod
     def get_by_username(db: Session, username: str) -> Optional[User]:
         """Get user by username."""
-        return db.query(User).filter(User.username == username).first()
+        return db.execute(_user_by_username_stmt, {"username": username}).scalar_one_or_none()
+    
+    @staticmethod
+    def username_exists(db: Session, username: str) -> bool:
+        """Check whether a username is taken without loading the user."""
+        return db.execute(_username_exists_stmt, {"username": username}).scalar()
+    
+    @staticmethod
+    async def get_by_username_async(db: AsyncSession, username: str) -> Optional[User]:
+        """Get user by username on an async session."""
+        result = await db.execute(_user_by_username_stmt, {"username": username})
+        return result.scalar_one_or_none()
     
     @staticmethod
     def get_all(db: Session, skip: int = 0, limit: int = 100) -> List[User]:
@@ -33,9 +91,10 @@ class UserRepository:
         return db.query(User).offset(skip).limit(limit).all()
     
     @staticmethod
+    @_retry_on_disconnect
     def delete(db: Session, user_id: int) -> bool:
         """Delete a user by ID."""
-        user = db.query(User).filter(User.id == user_id).first()
+        user = db.execute(_user_by_id_stmt, {"user_id": user_id}).scalar_one_or_none()
         if user:
             db.delete(user)
             db.commit()
@@ -47,6 +106,7 @@ class EntityRepository:
     """Repository for Entity model operations."""
     
     @staticmethod
+    @_retry_on_disconnect
     def create(
         db: Session,
         user_id: int,
@@ -63,20 +123,45 @@ class EntityRepository:
         )
         db.add(entity)
         db.commit()
-        db.refresh(entity)
         return entity
     
+    @staticmethod
+    @_retry_on_disconnect
+    def create_many(db: Session, user_id: int, names: List[str]) -> int:
+        """Create one entity per name in a single executemany INSERT; returns the count."""
+        if not names:
+            return 0
+        db.execute(insert(Entity), [{"user_id": user_id, "name": name} for name in names])
+        db.commit()
+        return len(names)
+    
     @staticmethod
     def get_by_id(db: Session, entity_id: int) -> Optional[Entity]:
         """Get entity by ID."""
-        return db.query(Entity).filter(Entity.id == entity_id).first()
+        return db.execute(_entity_by_id_stmt, {"entity_id": entity_id}).scalar_one_or_none()
     
     @staticmethod
-    def get_by_user(db: Session, user_id: int, skip: int = 0, limit: int = 100) -> List[Entity]:
-        """Get all entities for a user."""
-        return db.query(Entity).filter(Entity.user_id == user_id).offset(skip).limit(limit).all()
+    def get_by_user(
+        db: Session,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        after_id: Optional[int] = None
+    ) -> List[Entity]:
+        """Get all entities for a user, oldest first.
+        
+        Passing the last id of the previous page as `after_id` seeks straight to
+        the next page in the (user_id, id) index instead of skipping rows.
+        """
+        query = db.query(Entity).filter(Entity.user_id == user_id).order_by(Entity.id)
+        if after_id is not None:
+            query = query.filter(Entity.id > after_id)
+        elif skip:
+            query = query.offset(skip)
+        return query.limit(limit).all()
     
     @staticmethod
+    @_retry_on_disconnect
     def update(
         db: Session,
         entity_id: int,
@@ -85,7 +170,7 @@ class EntityRepository:
         doc_path: Optional[str] = None
     ) -> Optional[Entity]:
         """Update an entity."""
-        entity = db.query(Entity).filter(Entity.id == entity_id).first()
+        entity = db.execute(_entity_by_id_stmt, {"entity_id": entity_id}).scalar_one_or_none()
         if entity:
             if name is not None:
                 entity.name = name
@@ -94,13 +179,13 @@ class EntityRepository:
             if doc_path is not None:
                 entity.doc_path = doc_path
             db.commit()
-            db.refresh(entity)
         return entity
     
     @staticmethod
+    @_retry_on_disconnect
     def delete(db: Session, entity_id: int) -> bool:
         """Delete an entity by ID."""
-        entity = db.query(Entity).filter(Entity.id == entity_id).first()
+        entity = db.execute(_entity_by_id_stmt, {"entity_id": entity_id}).scalar_one_or_none()
         if entity:
             db.delete(entity)
             db.commit()
@@ -112,43 +197,66 @@ class TemplateRepository:
     """Repository for Template model operations."""
     
     @staticmethod
+    @_retry_on_disconnect
     def create(
         db: Session,
         user_id: int,
-        path: str,
+        template_path: str,
         file_hash: str,
         name: str = None,
         lang: Optional[str] = None,
         template_type: str = 'html',
         form_fields: Optional[dict] = None,
         html_structure: Optional[dict] = None
-    ) -> Template:
-        """Create a new template."""
-        import json
-        template = Template(
+    ) -> Optional[Template]:
+        """Create a new template, or return the user's existing one with the same file hash.
+        
+        On PostgreSQL and SQLite this is a single INSERT ... ON CONFLICT DO NOTHING
+        RETURNING round-trip, so concurrent uploads of the same file cannot race.
+        Returns None if the hash is already taken by another user's template.
+        """
+        values = dict(
             user_id=user_id,
-            template_path=path,
+            template_path=template_path,
             file_hash=file_hash,
             name=name,
             lang=lang,
             template_type=template_type,
-            form_fields=json.dumps(form_fields) if form_fields is not None else None,
-            html_structure=json.dumps(html_structure) if html_structure is not None else None
+            form_fields=form_fields,
+            html_structure=html_structure
+        )
+        dialect_insert = _UPSERT_INSERTS.get(db.get_bind().dialect.name)
+        if dialect_insert is None:
+            template = Template(**values)
+            db.add(template)
+            db.commit()
+            return template
+        
+        stmt = (
+            dialect_insert(Template)
+            .values(**values)
+            .on_conflict_do_nothing(index_elements=[Template.file_hash])
+            .returning(Template)
         )
-        db.add(template)
+        template = db.scalars(stmt).first()
         db.commit()
-        db.refresh(template)
+        if template is None:
+            # Another request already stored this hash; only hand it back if it's
+            # this user's, never another user's template
+            template = TemplateRepository.get_by_hash(db, file_hash)
+            if template is not None and template.user_id != user_id:
+                return None
         return template
     
     @staticmethod
     def get_by_id(db: Session, template_id: int) -> Optional[Template]:
         """Get template by ID."""
-        return db.query(Template).filter(Template.id == template_id).first()
+        return db.execute(_template_by_id_stmt, {"template_id": template_id}).scalar_one_or_none()
     
     @staticmethod
     def get_by_hash(db: Session, file_hash: str) -> Optional[Template]:
         """Get template by file hash."""
-        return db.query(Template).filter(Template.file_hash == file_hash).first()
+        return db.execute(_template_by_hash_stmt, {"file_hash": file_hash}).scalar_one_or_none()
     
     @staticmethod
     def get_all(db: Session, user_id: int, skip: int = 0, limit: int = 10) -> List[Template]:
@@ -156,9 +264,10 @@ class TemplateRepository:
         return db.query(Template).filter(Template.user_id == user_id).order_by(Template.created_at.desc()).offset(skip).limit(limit).all()
     
     @staticmethod
+    @_retry_on_disconnect
     def delete(db: Session, template_id: int) -> bool:
         """Delete a template by ID."""
-        template = db.query(Template).filter(Template.id == template_id).first()
+        template = db.execute(_template_by_id_stmt, {"template_id": template_id}).scalar_one_or_none()
         if template:
             db.delete(template)
             db.commit()
@@ -187,17 +296,22 @@ class ExtractedDataRepository:
     @staticmethod
     def get_single_by_entity(db: Session, entity_id: int) -> Optional[ExtractedData]:
         """Get the single consolidated extracted data record for an entity."""
-        return db.query(ExtractedData).filter(ExtractedData.entity_id == entity_id).first()
+        return db.execute(_extracted_data_by_entity_stmt, {"entity_id": entity_id}).scalar_one_or_none()
     
     @staticmethod
     def is_file_processed(db: Session, entity_id: int, file_hash: str) -> bool:
         """Check if a file has already been processed for this entity."""
-        record = db.query(ExtractedData).filter(ExtractedData.entity_id == entity_id).first()
-        if not record or not record.processed_file_hashes:
+        # Only the hash list is read (a unique-index probe on entity_id); the
+        # compressed extracted_toon_object is neither fetched nor decompressed
+        processed_file_hashes = db.execute(
+            _processed_hashes_by_entity_stmt, {"entity_id": entity_id}
+        ).scalar_one_or_none()
+        if not processed_file_hashes:
             return False
-        return file_hash in record.processed_file_hashes
+        return file_hash in processed_file_hashes
     
     @staticmethod
+    @_retry_on_disconnect
     def upsert_or_merge(
         db: Session,
         user_id: int,
@@ -212,7 +326,7 @@ class ExtractedDataRepository:
         New data is deep-merged with existing data, and file hash is added to the
         processed_file_hashes list for duplicate detection.
         """
-        existing = db.query(ExtractedData).filter(ExtractedData.entity_id == entity_id).first()
+        existing = db.execute(_extracted_data_by_entity_stmt, {"entity_id": entity_id}).scalar_one_or_none()
         
         if existing:
             # Merge new data with existing
@@ -229,7 +343,6 @@ class ExtractedDataRepository:
                 existing.processed_file_hashes = current_hashes + [file_hash]
             
             db.commit()
-            db.refresh(existing)
             return existing
         else:
             # Create new record
@@ -242,7 +355,6 @@ class ExtractedDataRepository:
             )
             db.add(extracted_data)
             db.commit()
-            db.refresh(extracted_data)
             return extracted_data
     
     @staticmethod
@@ -272,12 +384,12 @@ class ExtractedDataRepository:
     @staticmethod
     def get_by_id(db: Session, extracted_data_id: int) -> Optional[ExtractedData]:
         """Get extracted data by ID."""
-        return db.query(ExtractedData).filter(ExtractedData.id == extracted_data_id).first()
+        return db.execute(_extracted_data_by_id_stmt, {"extracted_data_id": extracted_data_id}).scalar_one_or_none()
     
     @staticmethod
     def get_by_entity(db: Session, entity_id: int) -> List[ExtractedData]:
         """Get all extracted data for an entity."""
-        return db.query(ExtractedData).filter(ExtractedData.entity_id == entity_id).all()
+        return db.execute(_extracted_data_by_entity_stmt, {"entity_id": entity_id}).scalars().all()
     
     @staticmethod
     def get_by_user(db: Session, user_id: int, skip: int = 0, limit: int = 100) -> List[ExtractedData]:
@@ -285,6 +397,7 @@ class ExtractedDataRepository:
         return db.query(ExtractedData).filter(ExtractedData.user_id == user_id).offset(skip).limit(limit).all()
     
     @staticmethod
+    @_retry_on_disconnect
     def update_status(
         db: Session,
         extracted_data_id: int,
@@ -292,19 +405,19 @@ class ExtractedDataRepository:
         extracted_toon_object: Optional[dict] = None
     ) -> Optional[ExtractedData]:
         """Update extracted data status and object."""
-        extracted_data = db.query(ExtractedData).filter(ExtractedData.id == extracted_data_id).first()
+        extracted_data = db.execute(_extracted_data_by_id_stmt, {"extracted_data_id": extracted_data_id}).scalar_one_or_none()
         if extracted_data:
             extracted_data.status = status
             if extracted_toon_object is not None:
                 extracted_data.extracted_toon_object = extracted_toon_object
             db.commit()
-            db.refresh(extracted_data)
         return extracted_data
     
     @staticmethod
+    @_retry_on_disconnect
     def delete(db: Session, extracted_data_id: int) -> bool:
         """Delete an extracted data record by ID."""
-        extracted_data = db.query(ExtractedData).filter(ExtractedData.id == extracted_data_id).first()
+        extracted_data = db.execute(_extracted_data_by_id_stmt, {"extracted_data_id": extracted_data_id}).scalar_one_or_none()
         if extracted_data:
             db.delete(extracted_data)
             db.commit()
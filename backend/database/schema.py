@@ -4,7 +4,7 @@ Database schema module.
 This module provides backwards compatibility and easy imports for database models.
 For new code, prefer importing from database.models or database.base directly.
 """
-from .base import Base, engine, get_db, init_db, SessionLocal
+from .base import Base, engine, get_db, init_db, SessionLocal, get_async_engine, get_async_db, AsyncSessionLocal
 from .models import User, Entity, Template, ExtractedData
 
 __all__ = [
@@ -13,6 +13,9 @@ __all__ = [
     "get_db",
     "init_db",
     "SessionLocal",
+    "get_async_engine",
+    "get_async_db",
+    "AsyncSessionLocal",
     "User",
     "Entity",
     "Template",
@@ -1,36 +1,10 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import Session
 from contextlib import contextmanager
 from typing import Generator
-import os
 
-# Database URL from environment variable or default to SQLite
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./app.db")
-
-# Create database engine
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
-)
-
-# Create SessionLocal class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-# Base class for models
-Base = declarative_base()
-
-
-def get_db() -> Generator[Session, None, None]:
-    """
-    Dependency function that yields a database session.
-    Ensures the session is properly closed after use.
-    """
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# The application has a single engine and session factory, defined in
+# database.base; this module re-exports them for existing imports.
+from .base import Base, engine, SessionLocal, get_db
 
 
 @contextmanager
@@ -49,4 +23,4 @@ def get_db_context() -> Generator[Session, None, None]:
         db.rollback()
         raise
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
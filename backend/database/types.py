@@ -0,0 +1,40 @@
+import gzip
+from typing import Any, Optional
+
+import orjson
+from sqlalchemy import LargeBinary
+from sqlalchemy.types import TypeDecorator
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+class CompressedJSON(TypeDecorator):
+    """
+    JSON value stored as a gzip-compressed blob.
+
+    Form field maps and extracted data are large, repetitive JSON documents,
+    so compressing them shrinks the row considerably. Rows written before this
+    type was introduced hold plain JSON text and are still read back as-is.
+
+    On PostgreSQL, columns created as json/text before this change must be
+    converted to bytea (scripts/migrate_compress_json_columns.py) before this
+    code is deployed: LargeBinary's result processor rejects the values the
+    driver returns for a json column, so those rows fail to load until then.
+    """
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value: Any, dialect) -> Optional[bytes]:
+        if value is None:
+            return None
+        return gzip.compress(orjson.dumps(value), compresslevel=1)
+
+    def process_result_value(self, value: Any, dialect) -> Any:
+        if value is None:
+            return None
+        if isinstance(value, str):
+            # SQLite hands back text stored in the old json column as str
+            value = value.encode("utf-8")
+        if value[:2] == GZIP_MAGIC:
+            value = gzip.decompress(value)
+        return orjson.loads(value)
@@ -13,14 +13,13 @@ sys.path.insert(0, str(backend_dir))
 from database.session import SessionLocal
 from database.repository import TemplateRepository
 from src.services.template_processing.html_parser import parse_html_template
-import json
 
 template_path = "uploads/templates/1/3d7f23bcb3ad84cf56c6d1f880a6ee1770aa82333a00fdaf49e1fe4d95dc6126.html"
 
 with open(template_path, 'r') as f:
     html = f.read()
 
-soup = BeautifulSoup(html, 'html.parser')
+soup = BeautifulSoup(html, 'lxml')
 
 # Field mappings based on labels/context
 field_mappings = {
@@ -51,9 +50,16 @@ field_mappings = {
     "Date & time": "enrolment_datetime",
 }
 
+# Lowercase the mapping keys once instead of on every input
+LOWER_MAPPINGS = tuple((key.lower(), name) for key, name in field_mappings.items())
+CLEAN_RE = re.compile(r'[^a-zA-Z0-9\s]')
+WORD_RE = re.compile(r'[a-zA-Z0-9]{3,}')
+
 # Find all text inputs without name attribute
 count = 0
 used_names = set()
+next_suffix = {}  # base name -> next suffix to try
+parent_texts = {}  # inputs sharing a parent reuse its extracted text
 
 for inp in soup.find_all('input'):
     input_type = inp.get('type', 'text')
@@ -61,12 +67,15 @@ for inp in soup.find_all('input'):
         # Try to find label from previous siblings or parent
         parent = inp.find_parent(['div', 'td'])
         if parent:
-            label_text = parent.get_text()
+            if id(parent) not in parent_texts:
+                label_text = parent.get_text()
+                parent_texts[id(parent)] = (label_text, label_text.lower())
+            label_text, lower_text = parent_texts[id(parent)]
             
             # Try to match with field mappings
             matched = False
-            for key, name in field_mappings.items():
-                if key.lower() in label_text.lower() and name not in used_names:
+            for key, name in LOWER_MAPPINGS:
+                if key in lower_text and name not in used_names:
                     inp['name'] = name
                     used_names.add(name)
                     count += 1
@@ -76,16 +85,16 @@ for inp in soup.find_all('input'):
             
             if not matched:
                 # Generate a name from nearby text
-                clean_text = re.sub(r'[^a-zA-Z0-9\s]', '', label_text)
-                words = [w for w in clean_text.split() if len(w) > 2][:3]
+                words = WORD_RE.findall(CLEAN_RE.sub('', label_text))[:3]
                 if words:
                     name = '_'.join(words).lower()
-                    # Ensure uniqueness
+                    # Ensure uniqueness, resuming from the last suffix used for this base
                     base_name = name
-                    suffix = 1
+                    suffix = next_suffix.get(base_name, 1)
                     while name in used_names:
                         name = f"{base_name}_{suffix}"
                         suffix += 1
+                    next_suffix[base_name] = suffix
                     inp['name'] = name
                     used_names.add(name)
                     count += 1
@@ -115,8 +124,8 @@ try:
     
     template = TemplateRepository.get_by_id(db, 1)
     if template:
-        template.form_fields = json.dumps(form_fields)
-        template.html_structure = json.dumps(html_structure)
+        template.form_fields = form_fields
+        template.html_structure = html_structure
         db.commit()
         print(f"\nUpdated database with {len(form_fields)} form fields")
         print("Form field names:", list(form_fields.keys()))
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Create indexes declared on the models that are missing from the database.
+
+Base.metadata.create_all() only creates indexes together with their table,
+so databases created before an index was added to a model need this script.
+It is safe to run repeatedly: existing indexes are left untouched.
+
+Usage:
+    python scripts/migrate_add_indexes.py
+"""
+
+import sys
+from pathlib import Path
+
+# Add backend directory to Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from sqlalchemy import inspect
+from database.base import Base, engine
+import database.models  # noqa: F401 - registers all models on Base.metadata
+
+
+def add_missing_indexes():
+    """Create every model index that does not exist yet."""
+    inspector = inspect(engine)
+    created = 0
+    
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            print(f"Table '{table.name}' does not exist yet, skipping (run init_db first)")
+            continue
+        
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name in existing:
+                continue
+            print(f"Creating index {index.name} on {table.name}...")
+            index.create(bind=engine)
+            created += 1
+    
+    print(f"\nCreated {created} missing index(es).")
+
+
+if __name__ == "__main__":
+    add_missing_indexes()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Convert CompressedJSON columns to a binary column type on PostgreSQL.
+
+Template.form_fields, Template.html_structure and
+ExtractedData.extracted_toon_object used to be text/json columns and are now
+stored as gzip-compressed bytes. PostgreSQL will not write bytes into the old
+columns, so databases created before the change need them converted to bytea.
+Existing values are kept as their UTF-8 JSON text, which CompressedJSON still
+reads; they are compressed the next time the row is written.
+
+SQLite stores the blobs in the existing columns as-is and needs no change.
+It is safe to run repeatedly: columns that are already binary are skipped.
+
+Usage:
+    python scripts/migrate_compress_json_columns.py
+"""
+
+import sys
+from pathlib import Path
+
+# Add backend directory to Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from sqlalchemy import LargeBinary, inspect, text
+from database.base import Base, engine
+from database.types import CompressedJSON
+import database.models  # noqa: F401 - registers all models on Base.metadata
+
+
+def convert_compressed_json_columns():
+    """Alter every CompressedJSON column that isn't binary yet to bytea."""
+    if engine.dialect.name != "postgresql":
+        print(f"Nothing to do on {engine.dialect.name}; only PostgreSQL needs the column type changed.")
+        return
+    
+    inspector = inspect(engine)
+    converted = 0
+    
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                print(f"Table '{table.name}' does not exist yet, skipping (run init_db first)")
+                continue
+            
+            existing = {column["name"]: column["type"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if not isinstance(column.type, CompressedJSON) or column.name not in existing:
+                    continue
+                if isinstance(existing[column.name], LargeBinary):
+                    continue
+                print(f"Converting {table.name}.{column.name} from {existing[column.name]} to bytea...")
+                conn.execute(text(
+                    f'ALTER TABLE "{table.name}" ALTER COLUMN "{column.name}" TYPE bytea '
+                    f'USING convert_to("{column.name}"::text, \'UTF8\')'
+                ))
+                converted += 1
+    
+    print(f"\nConverted {converted} column(s).")
+
+
+if __name__ == "__main__":
+    convert_compressed_json_columns()
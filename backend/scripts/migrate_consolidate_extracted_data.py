@@ -23,27 +23,109 @@ Usage:
 
 import sys
 from pathlib import Path
-from collections import defaultdict
+from itertools import groupby
+
+import orjson
 
 # Add backend directory to Python path
 backend_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(backend_dir))
 
-from sqlalchemy import text
+from sqlalchemy import LargeBinary, bindparam, inspect, text
 from database.base import SessionLocal
+from database.types import CompressedJSON
+
+# Rows per DELETE ... IN (...) / executemany UPDATE batch
+BATCH_SIZE = 1000
+
+DELETE_STMT = text(
+    "DELETE FROM extracted_data WHERE id IN :ids"
+).bindparams(bindparam("ids", expanding=True))
+
+UPDATE_STMT = text("""
+    UPDATE extracted_data 
+    SET extracted_toon_object = :merged_data,
+        status = :status
+    WHERE id = :keep_id
+""")
+
+
+# Decodes and encodes extracted_toon_object exactly as the ORM column does
+COMPRESSED_JSON = CompressedJSON()
+
+
+def decode_stored_json(value) -> dict:
+    """Decode extracted_toon_object as read with plain SQL, whatever format it is stored in."""
+    if isinstance(value, (dict, list)):
+        # An unconverted PostgreSQL json column, already decoded by the driver
+        return value
+    if isinstance(value, memoryview):
+        # psycopg2 returns bytea as memoryview
+        value = value.tobytes()
+    try:
+        return COMPRESSED_JSON.process_result_value(value, None)
+    except orjson.JSONDecodeError:
+        return {}
 
 
-def deep_merge(existing: dict, new: dict) -> dict:
-    """Deep merge two dictionaries. New values take precedence for non-empty values."""
-    merged = existing.copy() if existing else {}
+def stores_compressed(db) -> bool:
+    """Whether extracted_toon_object can hold CompressedJSON blobs.
+    
+    A PostgreSQL json column can't until migrate_compress_json_columns.py has
+    converted it to bytea; SQLite stores the blobs in any column.
+    """
+    bind = db.get_bind()
+    if bind.dialect.name != "postgresql":
+        return True
+    columns = {column["name"]: column["type"] for column in inspect(bind).get_columns("extracted_data")}
+    return isinstance(columns["extracted_toon_object"], LargeBinary)
+
+
+def chunked(items: list, size: int = BATCH_SIZE):
+    """Yield successive slices of at most `size` items."""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+# Placeholder strings that count as an empty value when merging
+EMPTY_VALUES = frozenset(['', 'N/A', '""'])
+
+
+def merge_into(target: dict, new: dict) -> None:
+    """Merge `new` into `target` in place. New values take precedence for non-empty values."""
     if not new:
-        return merged
+        return
     for key, value in new.items():
-        if value and value not in ['', 'N/A', '""', None]:
-            merged[key] = value
-        elif key not in merged:
-            merged[key] = value
-    return merged
+        if value and not (isinstance(value, str) and value in EMPTY_VALUES):
+            target[key] = value
+        elif key not in target:
+            target[key] = value
+
+
+def flush_writes(db, ids_to_delete: list, update_rows: list) -> tuple[int, int]:
+    """Send buffered deletes and updates in batches, then clear the buffers."""
+    for ids in chunked(ids_to_delete):
+        db.execute(DELETE_STMT, {'ids': ids})
+    for rows in chunked(update_rows):
+        db.execute(UPDATE_STMT, rows)
+    counts = (len(ids_to_delete), len(update_rows))
+    ids_to_delete.clear()
+    update_rows.clear()
+    return counts
+
+
+def tune_for_bulk_write(db) -> None:
+    """Relax durability settings for the migration, which commits once at the end."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        # Connection level only; the database file's journal mode is left alone
+        db.execute(text("PRAGMA synchronous = NORMAL"))
+        db.execute(text("PRAGMA temp_store = MEMORY"))
+        db.execute(text("PRAGMA cache_size = -262144"))  # 256MB page cache
+    elif dialect == "postgresql":
+        # Scoped to the migration's transaction
+        db.execute(text("SET LOCAL synchronous_commit = off"))
+        db.execute(text("SET LOCAL work_mem = '256MB'"))
 
 
 def consolidate_extracted_data():
@@ -51,34 +133,86 @@ def consolidate_extracted_data():
     db = SessionLocal()
     
     try:
-        # Get all extracted data grouped by entity_id
+        tune_for_bulk_write(db)
+        compressed = stores_compressed(db)
+        
+        total_records, total_entities = db.execute(text(
+            "SELECT COUNT(*), COUNT(DISTINCT entity_id) FROM extracted_data"
+        )).one()
+        
+        # Stream only the rows of entities that have duplicates, ordered by entity
+        # so only one entity's records are held at a time
         result = db.execute(text("""
             SELECT id, user_id, entity_id, status, file_hash, extracted_toon_object
             FROM extracted_data
+            WHERE entity_id IN (
+                SELECT entity_id FROM extracted_data
+                GROUP BY entity_id
+                HAVING COUNT(*) > 1
+            )
             ORDER BY entity_id, id
-        """))
-        rows = result.fetchall()
+        """).execution_options(stream_results=True, yield_per=BATCH_SIZE))
         
-        if not rows:
-            print("No extracted data records found. Nothing to migrate.")
-            return
+        entities_with_multiple = 0
+        deleted_count = 0
+        updated_count = 0
         
-        # Group by entity_id
-        entity_groups = defaultdict(list)
-        for row in rows:
-            entity_groups[row.entity_id].append({
-                'id': row.id,
-                'user_id': row.user_id,
-                'entity_id': row.entity_id,
-                'status': row.status,
-                'file_hash': row.file_hash,
-                'extracted_toon_object': row.extracted_toon_object
+        # Writes are buffered and sent in batches instead of two statements per entity
+        ids_to_delete = []
+        update_rows = []
+        for entity_id, group in groupby(result, key=lambda row: row.entity_id):
+            records = list(group)
+            entities_with_multiple += 1
+            print(f"\nProcessing entity {entity_id} with {len(records)} records...")
+            
+            # Collect all file hashes
+            file_hashes = []
+            merged_data = {}
+            best_status = 0
+            keep_id = records[0].id  # Keep the first record
+            
+            for record in records:
+                if record.file_hash:
+                    file_hashes.append(record.file_hash)
+                
+                # Merge extracted data
+                if record.extracted_toon_object:
+                    merge_into(merged_data, decode_stored_json(record.extracted_toon_object))
+                
+                # Keep success status if any record was successful
+                if record.status == 1:
+                    best_status = 1
+            
+            # Delete all records except the first one
+            ids_to_delete.extend(r.id for r in records[1:])
+            
+            # Update the kept record with consolidated data
+            # Written in the format the column holds; json columns still get JSON text
+            update_rows.append({
+                'merged_data': (
+                    COMPRESSED_JSON.process_bind_param(merged_data, None)
+                    if compressed else orjson.dumps(merged_data).decode()
+                ),
+                'status': best_status,
+                'keep_id': keep_id
             })
+            print(f"  Consolidating into record {keep_id} with {len(file_hashes)} file hashes")
+            
+            if len(ids_to_delete) >= BATCH_SIZE or len(update_rows) >= BATCH_SIZE:
+                deleted, updated = flush_writes(db, ids_to_delete, update_rows)
+                deleted_count += deleted
+                updated_count += updated
+        
+        deleted, updated = flush_writes(db, ids_to_delete, update_rows)
+        deleted_count += deleted
+        updated_count += updated
         
-        print(f"Found {len(rows)} records across {len(entity_groups)} entities")
+        if not total_records:
+            print("No extracted data records found. Nothing to migrate.")
+            return
         
-        entities_with_multiple = {k: v for k, v in entity_groups.items() if len(v) > 1}
-        print(f"Entities with multiple records: {len(entities_with_multiple)}")
+        print(f"\nFound {total_records} records across {total_entities} entities")
+        print(f"Entities with multiple records: {entities_with_multiple}")
         
         if not entities_with_multiple:
             print("No entities have multiple records. Migration will only update schema.")
@@ -98,57 +232,8 @@ ALTER TABLE extracted_data ADD CONSTRAINT uq_extracted_data_entity_id UNIQUE (en
             """)
             return
         
-        # Process each entity with multiple records
-        for entity_id, records in entities_with_multiple.items():
-            print(f"\nProcessing entity {entity_id} with {len(records)} records...")
-            
-            # Collect all file hashes
-            file_hashes = []
-            merged_data = {}
-            best_status = 0
-            keep_id = records[0]['id']  # Keep the first record
-            user_id = records[0]['user_id']
-            
-            for record in records:
-                if record['file_hash']:
-                    file_hashes.append(record['file_hash'])
-                
-                # Merge extracted data
-                if record['extracted_toon_object']:
-                    import json
-                    data = record['extracted_toon_object']
-                    if isinstance(data, str):
-                        try:
-                            data = json.loads(data)
-                        except json.JSONDecodeError:
-                            data = {}
-                    merged_data = deep_merge(merged_data, data)
-                
-                # Keep success status if any record was successful
-                if record['status'] == 1:
-                    best_status = 1
-            
-            # Delete all records except the first one
-            ids_to_delete = [r['id'] for r in records[1:]]
-            if ids_to_delete:
-                db.execute(text(f"""
-                    DELETE FROM extracted_data WHERE id IN ({','.join(map(str, ids_to_delete))})
-                """))
-                print(f"  Deleted {len(ids_to_delete)} redundant records")
-            
-            # Update the kept record with consolidated data
-            import json
-            db.execute(text("""
-                UPDATE extracted_data 
-                SET extracted_toon_object = :merged_data,
-                    status = :status
-                WHERE id = :keep_id
-            """), {
-                'merged_data': json.dumps(merged_data),
-                'status': best_status,
-                'keep_id': keep_id
-            })
-            print(f"  Consolidated into record {keep_id} with {len(file_hashes)} file hashes")
+        print(f"Deleted {deleted_count} redundant records")
+        print(f"Updated {updated_count} consolidated records")
         
         db.commit()
         print("\n" + "="*60)
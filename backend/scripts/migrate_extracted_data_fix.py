@@ -1,38 +1,71 @@
 
 import sqlite3
-import json
 import sys
 import os
 
 DB_PATH = "form_filling.db"
 
+# One merged row per entity, built with SQLite's JSON functions so the
+# payloads never round-trip through Python. json_each() reports booleans as
+# 1/0 and nested values as text, so those are re-wrapped as JSON.
+MERGE_INSERT_SQL = """
+WITH first_rows AS (
+    SELECT entity_id, MIN(id) AS id
+    FROM extracted_data_old
+    GROUP BY entity_id
+),
+hashes AS (
+    SELECT entity_id, json_group_array(file_hash) AS processed_file_hashes
+    FROM (SELECT entity_id, file_hash FROM extracted_data_old ORDER BY entity_id, id)
+    GROUP BY entity_id
+),
+ranked_values AS (
+    SELECT o.entity_id, j.key, j.value, j.type,
+           ROW_NUMBER() OVER (PARTITION BY o.entity_id, j.key ORDER BY o.id DESC) AS rank
+    FROM extracted_data_old o, json_each(o.extracted_toon_object) j
+    WHERE json_valid(o.extracted_toon_object)
+      AND json_type(o.extracted_toon_object) = 'object'
+),
+merged AS (
+    SELECT entity_id,
+           json_group_object(key, CASE
+               WHEN type = 'true' THEN json('true')
+               WHEN type = 'false' THEN json('false')
+               WHEN type IN ('object', 'array') THEN json(value)
+               ELSE value
+           END) AS extracted_toon_object
+    FROM ranked_values
+    WHERE rank = 1
+    GROUP BY entity_id
+)
+INSERT INTO extracted_data (id, user_id, entity_id, status, processed_file_hashes, extracted_toon_object)
+SELECT o.id, o.user_id, o.entity_id, o.status,
+       h.processed_file_hashes,
+       COALESCE(m.extracted_toon_object, '{}')
+FROM first_rows f
+JOIN extracted_data_old o ON o.id = f.id
+JOIN hashes h ON h.entity_id = f.entity_id
+LEFT JOIN merged m ON m.entity_id = f.entity_id
+"""
+
 def migrate():
     print(f"Migrating database at {DB_PATH}...")
     conn = sqlite3.connect(DB_PATH)
     conn.row_factory = sqlite3.Row
+    # Manage the transaction explicitly so the rename, copy and drop commit together
+    conn.isolation_level = None
     cursor = conn.cursor()
+    # Skip fsyncs during the bulk load; PRAGMA synchronous can't change inside a transaction
+    previous_synchronous = cursor.execute("PRAGMA synchronous").fetchone()[0]
+    cursor.execute("PRAGMA synchronous = OFF")
 
     try:
-        # 1. Read existing data
-        cursor.execute("SELECT * FROM extracted_data")
-        rows = cursor.fetchall()
-        data_to_migrate = []
-        for row in rows:
-            data_to_migrate.append({
-                "id": row["id"],
-                "user_id": row["user_id"],
-                "entity_id": row["entity_id"],
-                "status": row["status"],
-                "file_hash": row["file_hash"],
-                "extracted_toon_object": row["extracted_toon_object"]
-            })
-        
-        print(f"Found {len(data_to_migrate)} rows to migrate.")
+        cursor.execute("BEGIN")
 
-        # 2. Rename old table
+        # 1. Rename old table
         cursor.execute("ALTER TABLE extracted_data RENAME TO extracted_data_old")
 
-        # 3. Create new table matching the SQLAlchemy model
+        # 2. Create new table matching the SQLAlchemy model
         create_table_sql = """
         CREATE TABLE extracted_data (
             id INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
@@ -47,67 +80,40 @@ def migrate():
         );
         """
         cursor.execute(create_table_sql)
-        cursor.execute("CREATE INDEX ix_extracted_data_entity_id ON extracted_data (entity_id)")
-        cursor.execute("CREATE INDEX ix_extracted_data_user_id ON extracted_data (user_id)")
 
-        # 4. Insert migrated data
-        insert_sql = """
-        INSERT INTO extracted_data (id, user_id, entity_id, status, processed_file_hashes, extracted_toon_object)
-        VALUES (?, ?, ?, ?, ?, ?)
-        """
-        
-        # Group by entity_id if necessary (though current data has unique entity_ids)
-        # But logical correctness: if multiple rows existed for same entity, we should merge.
-        # However, the old schema didn't enforce unique entity_id? Wait, checking old schema...
-        # "FOREIGN KEY(entity_id) REFERENCES entities (id) ON DELETE CASCADE" - no unique constraint on entity_id in old schema?
-        # Let's check the old schema output I got earlier:
-        # CREATE INDEX ix_extracted_data_entity_id ON extracted_data (entity_id);
-        # No UNIQUE index on entity_id. So multiple rows COULD exist.
-        
-        migrated_data = {}
-        for row in data_to_migrate:
-            e_id = row['entity_id']
-            if e_id not in migrated_data:
-                migrated_data[e_id] = {
-                    "id": row["id"], # Keep first ID
-                    "user_id": row["user_id"],
-                    "entity_id": row["entity_id"],
-                    "status": row["status"],
-                    "hashes": [row["file_hash"]],
-                    "extracted_toon_object": json.loads(row["extracted_toon_object"]) if row["extracted_toon_object"] else {}
-                }
-            else:
-                # Merge logic (simplified: append hash, merge dicts)
-                migrated_data[e_id]["hashes"].append(row["file_hash"])
-                # Merge extracted data? 
-                # For now, let's assuming simply keeping the latest or merging is fine.
-                # But since the goal is to fix the schema error first, simple merge.
-                current_data = migrated_data[e_id]["extracted_toon_object"]
-                new_data = json.loads(row["extracted_toon_object"]) if row["extracted_toon_object"] else {}
-                current_data.update(new_data)
-                migrated_data[e_id]["extracted_toon_object"] = current_data
+        # 3. Merge old rows into one row per entity inside SQLite.
+        # The old schema had no UNIQUE constraint on entity_id, so multiple rows
+        # per entity may exist. The first row's id, user_id and status are kept,
+        # every file_hash is collected in id order, and for each key of
+        # extracted_toon_object the value from the newest row wins.
+        row_count, entity_count = cursor.execute(
+            "SELECT COUNT(*), COUNT(DISTINCT entity_id) FROM extracted_data_old"
+        ).fetchone()
+        print(f"Found {row_count} rows to migrate.")
 
-        for item in migrated_data.values():
-            cursor.execute(insert_sql, (
-                item["id"],
-                item["user_id"],
-                item["entity_id"],
-                item["status"],
-                json.dumps(item["hashes"]),
-                json.dumps(item["extracted_toon_object"])
-            ))
+        cursor.execute(MERGE_INSERT_SQL)
 
-        # 5. Drop old table
+        print(f"Migrated {row_count} rows into {entity_count} entity records.")
+
+        # 4. Drop old table (its indexes go with it, freeing their names)
         cursor.execute("DROP TABLE extracted_data_old")
 
-        conn.commit()
+        # 5. Build secondary indexes in one pass over the loaded rows rather
+        # than maintaining them on every insert, then refresh planner stats
+        cursor.execute("CREATE INDEX ix_extracted_data_entity_id ON extracted_data (entity_id)")
+        cursor.execute("CREATE INDEX ix_extracted_data_user_id ON extracted_data (user_id)")
+        cursor.execute("ANALYZE extracted_data")
+
+        cursor.execute("COMMIT")
         print("Migration successful.")
 
     except Exception as e:
-        conn.rollback()
+        if conn.in_transaction:
+            cursor.execute("ROLLBACK")
         print(f"Migration failed: {e}")
         sys.exit(1)
     finally:
+        cursor.execute(f"PRAGMA synchronous = {int(previous_synchronous)}")
         conn.close()
 
 if __name__ == "__main__":
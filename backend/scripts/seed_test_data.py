@@ -12,9 +12,12 @@ import json
 backend_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(backend_dir))
 
+from sqlalchemy import select
 from database.session import SessionLocal
 from database.models.entity import Entity
 from database.models.extracted_data import ExtractedData
+# Dialect specific INSERT constructs that support ON CONFLICT, shared with the repository
+from database.repository import _UPSERT_INSERTS
 
 # Dummy extracted data simulating Aadhaar card information
 # Contains ALL fields from the Aadhaar form template
@@ -146,6 +149,23 @@ DUMMY_EXTRACTED_DATA_2 = {
 }
 
 
+# Entities to seed: (name, entity_metadata, processed_file_hashes, extracted data)
+SEED_ENTITIES = [
+    (
+        "Rajesh Kumar",
+        {"type": "individual", "source": "aadhaar"},
+        ["dummy_hash_aadhaar_001", "dummy_hash_pan_001"],
+        DUMMY_EXTRACTED_DATA,
+    ),
+    (
+        "Priya Sharma",
+        {"type": "individual", "source": "aadhaar"},
+        ["dummy_hash_aadhaar_002"],
+        DUMMY_EXTRACTED_DATA_2,
+    ),
+]
+
+
 def seed_test_data():
     """Seed the database with test data for user_id 1."""
     db = SessionLocal()
@@ -162,83 +182,54 @@ def seed_test_data():
         
         print(f"[INFO] Seeding test data for user: {user.username}")
         
-        # ============ Entity 1: Rajesh Kumar ============
-        entity1 = db.query(Entity).filter(
-            Entity.user_id == user_id,
-            Entity.name == "Rajesh Kumar"
-        ).first()
-        
-        if not entity1:
-            entity1 = Entity(
-                user_id=user_id,
-                name="Rajesh Kumar",
-                entity_metadata={"type": "individual", "source": "aadhaar"}
-            )
-            db.add(entity1)
-            db.flush()  # Get the ID
-            print(f"[INFO] Created entity: Rajesh Kumar (id={entity1.id})")
-        else:
-            print(f"[INFO] Entity already exists: Rajesh Kumar (id={entity1.id})")
-        
-        # Create or update extracted data for entity1
-        extracted1 = db.query(ExtractedData).filter(
-            ExtractedData.entity_id == entity1.id
-        ).first()
-        
-        if not extracted1:
-            extracted1 = ExtractedData(
-                user_id=user_id,
-                entity_id=entity1.id,
-                status=1,
-                processed_file_hashes=["dummy_hash_aadhaar_001", "dummy_hash_pan_001"],
-                extracted_toon_object=DUMMY_EXTRACTED_DATA
-            )
-            db.add(extracted1)
-            print(f"[INFO] Created extracted data for entity: Rajesh Kumar")
-        else:
-            extracted1.extracted_toon_object = DUMMY_EXTRACTED_DATA
-            extracted1.status = 1
-            extracted1.processed_file_hashes = ["dummy_hash_aadhaar_001", "dummy_hash_pan_001"]
-            print(f"[INFO] Updated extracted data for entity: Rajesh Kumar")
-        
-        # ============ Entity 2: Priya Sharma ============
-        entity2 = db.query(Entity).filter(
-            Entity.user_id == user_id,
-            Entity.name == "Priya Sharma"
-        ).first()
-        
-        if not entity2:
-            entity2 = Entity(
-                user_id=user_id,
-                name="Priya Sharma",
-                entity_metadata={"type": "individual", "source": "aadhaar"}
-            )
-            db.add(entity2)
-            db.flush()
-            print(f"[INFO] Created entity: Priya Sharma (id={entity2.id})")
-        else:
-            print(f"[INFO] Entity already exists: Priya Sharma (id={entity2.id})")
+        # ============ Entities ============
+        # Look up all seed entities in one query and insert the missing ones in one flush
+        names = [name for name, _, _, _ in SEED_ENTITIES]
+        entities = {
+            e.name: e
+            for e in db.query(Entity).filter(Entity.user_id == user_id, Entity.name.in_(names))
+        }
+        for name in names:
+            if name in entities:
+                print(f"[INFO] Entity already exists: {name} (id={entities[name].id})")
         
-        # Create or update extracted data for entity2
-        extracted2 = db.query(ExtractedData).filter(
-            ExtractedData.entity_id == entity2.id
-        ).first()
+        new_entities = [
+            Entity(user_id=user_id, name=name, entity_metadata=metadata)
+            for name, metadata, _, _ in SEED_ENTITIES
+            if name not in entities
+        ]
+        if new_entities:
+            db.add_all(new_entities)
+            db.flush()  # Get the IDs
+            for entity in new_entities:
+                entities[entity.name] = entity
+                print(f"[INFO] Created entity: {entity.name} (id={entity.id})")
         
-        if not extracted2:
-            extracted2 = ExtractedData(
-                user_id=user_id,
-                entity_id=entity2.id,
-                status=1,
-                processed_file_hashes=["dummy_hash_aadhaar_002"],
-                extracted_toon_object=DUMMY_EXTRACTED_DATA_2
-            )
-            db.add(extracted2)
-            print(f"[INFO] Created extracted data for entity: Priya Sharma")
-        else:
-            extracted2.extracted_toon_object = DUMMY_EXTRACTED_DATA_2
-            extracted2.status = 1
-            extracted2.processed_file_hashes = ["dummy_hash_aadhaar_002"]
-            print(f"[INFO] Updated extracted data for entity: Priya Sharma")
+        # ============ Extracted data ============
+        # entity_id is unique, so one INSERT ... ON CONFLICT DO UPDATE creates or
+        # refreshes every seed record in a single statement
+        dialect_insert = _UPSERT_INSERTS[db.get_bind().dialect.name]
+        stmt = dialect_insert(ExtractedData).values([
+            {
+                "user_id": user_id,
+                "entity_id": entities[name].id,
+                "status": 1,
+                "processed_file_hashes": file_hashes,
+                "extracted_toon_object": data,
+            }
+            for name, _, file_hashes, data in SEED_ENTITIES
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ExtractedData.entity_id],
+            set_={
+                "status": stmt.excluded.status,
+                "processed_file_hashes": stmt.excluded.processed_file_hashes,
+                "extracted_toon_object": stmt.excluded.extracted_toon_object,
+            },
+        )
+        db.execute(stmt)
+        for name in names:
+            print(f"[INFO] Upserted extracted data for entity: {name}")
         
         # Commit all changes
         db.commit()
@@ -247,8 +238,8 @@ def seed_test_data():
         print("[SUCCESS] Test data seeded successfully!")
         print("="*50)
         print(f"\nCreated/Updated entities for user_id={user_id}:")
-        print(f"  1. Rajesh Kumar (entity_id={entity1.id})")
-        print(f"  2. Priya Sharma (entity_id={entity2.id})")
+        for index, name in enumerate(names, start=1):
+            print(f"  {index}. {name} (entity_id={entities[name].id})")
         print("\nYou can now test form-filling with these entities.")
         
         return True
@@ -272,12 +263,18 @@ def show_current_data():
         print("Current Database State")
         print("="*50)
         
-        entities = db.query(Entity).all()
+        # Plain column rows; no ORM instances are needed just to print
+        entities = db.execute(select(Entity.id, Entity.user_id, Entity.name)).all()
         print(f"\nEntities ({len(entities)} total):")
         for e in entities:
             print(f"  - id={e.id}, user_id={e.user_id}, name='{e.name}'")
         
-        extracted = db.query(ExtractedData).all()
+        extracted = db.execute(select(
+            ExtractedData.id,
+            ExtractedData.entity_id,
+            ExtractedData.status,
+            ExtractedData.extracted_toon_object,
+        )).all()
         print(f"\nExtracted Data ({len(extracted)} total):")
         for ed in extracted:
             data_keys = list(ed.extracted_toon_object.keys()) if ed.extracted_toon_object else []
@@ -1,40 +1,115 @@
+import math
+
 import fitz
 from docx import Document
 from pathlib import Path
+from typing import Union
 
 BASE_DIR = Path(__file__).resolve().parent
 OUTPUTS_DIR = BASE_DIR / "outputs"
 
 OUTPUTS_DIR.mkdir(exist_ok=True)
 
-def convert_pdf_to_docx(pdf_path: str, docx_path: str):
-    pdf = fitz.open(pdf_path)
+# get_text("blocks") tuples: (x0, y0, x1, y1, text, block_no, block_type)
+TEXT_BLOCK = 0
+
+
+def _open_pdf(pdf: Union[str, Path, bytes]) -> fitz.Document:
+    # Bytes (e.g. an upload already read into memory) are parsed in place instead of
+    # being written to a temporary file and read back
+    if isinstance(pdf, (bytes, bytearray)):
+        return fitz.open(stream=pdf, filetype="pdf")
+    return fitz.open(pdf)
+
+
+def convert_pdf_to_docx(pdf: Union[str, Path, bytes], docx_path: str):
     document = Document()
 
-    for page in pdf:
-        text = page.get_text("text")
-        if text.strip():
-            for line in text.split("\n"):
-                document.add_paragraph(line)
+    with _open_pdf(pdf) as doc:
+        for page in doc:
+            # One paragraph per text block; the block's line breaks become <w:br/> in its run
+            for block in page.get_text("blocks"):
+                text = block[4].rstrip("\n")
+                if block[6] == TEXT_BLOCK and text:
+                    document.add_paragraph(text)
 
     document.save(docx_path)
 
 
+# Layout for convert_docx_to_pdf: text box on a default (A4) page and 15pt lines
+FONT_SIZE = 11
+LINE_HEIGHT = 15
+TEXT_RECT = fitz.Rect(50, 50, 545, 800)
+
+
+def _paragraph_lines(text: str) -> int:
+    """Estimate how many wrapped lines a paragraph takes in TEXT_RECT."""
+    width = fitz.get_text_length(text, fontsize=FONT_SIZE)
+    return max(1, math.ceil(width / TEXT_RECT.width))
+
+
+def _insert_text(page: fitz.Page, text: str) -> bool:
+    """Write text into TEXT_RECT; returns False (writing nothing) if it overflows."""
+    return page.insert_textbox(
+        TEXT_RECT,
+        text,
+        fontsize=FONT_SIZE,
+        lineheight=LINE_HEIGHT / FONT_SIZE,
+    ) >= 0
+
+
+def _split_paragraph(paragraph: str) -> tuple[str, str]:
+    """Split a paragraph too tall for one page into the words that fit and the rest."""
+    words = paragraph.split(" ")
+    # Binary search on a scratch page, since a successful insert writes its text
+    with fitz.open() as scratch:
+        fits, overflows = 0, len(words)
+        while overflows - fits > 1:
+            middle = (fits + overflows) // 2
+            if _insert_text(scratch.new_page(), " ".join(words[:middle])):
+                fits = middle
+            else:
+                overflows = middle
+    # Always make progress, even on a single word wider than the whole box
+    fits = max(fits, 1)
+    return " ".join(words[:fits]), " ".join(words[fits:])
+
+
+def _write_page(pdf: fitz.Document, paragraphs: list) -> list:
+    """Lay out leading paragraphs on a new page in one textbox; returns the ones left over."""
+    page = pdf.new_page()
+    count = len(paragraphs)
+    # insert_textbox writes nothing when the text overflows, so drop paragraphs
+    # from the end until it fits (the width estimate ignores word wrapping)
+    while count and not _insert_text(page, "\n".join(paragraphs[:count])):
+        count -= 1
+    if count:
+        return paragraphs[count:]
+
+    # The first paragraph alone is taller than the page: continue it on the next one
+    head, rest = _split_paragraph(paragraphs[0])
+    _insert_text(page, head)
+    return ([rest] if rest else []) + paragraphs[1:]
+
+
 def convert_docx_to_pdf(docx_path: str, pdf_path: str):
     doc = Document(docx_path)
     pdf = fitz.open()
-    page = pdf.new_page()
+    max_lines = int(TEXT_RECT.height // LINE_HEIGHT)
 
-    y = 50
+    pending = []
+    pending_lines = 0
     for para in doc.paragraphs:
-        page.insert_text((50, y), para.text, fontsize=11)
-        y += 15
+        lines = _paragraph_lines(para.text)
+        if pending and pending_lines + lines > max_lines:
+            pending = _write_page(pdf, pending)
+            pending_lines = sum(_paragraph_lines(text) for text in pending)
+        pending.append(para.text)
+        pending_lines += lines
 
-        if y > 800:
-            page = pdf.new_page()
-            y = 50
+    while pending:
+        pending = _write_page(pdf, pending)
 
+    if not len(pdf):
+        pdf.new_page()
     pdf.save(pdf_path)
-
-
-    
\ No newline at end of file
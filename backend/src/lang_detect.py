@@ -1,13 +1,30 @@
 import fasttext
-import os
+import threading
+from pathlib import Path
 
-path = os.path.join("src","lid.176.ftz") 
-print(path)
-model = fasttext.load_model(path)
+# Resolved next to this module so detection works from any working directory
+MODEL_PATH = Path(__file__).resolve().parent / "lid.176.ftz"
+
+# The language signal saturates well within this many characters, and
+# prediction cost grows with input length
+MAX_DETECT_CHARS = 512
+
+_model = None
+_model_lock = threading.Lock()
+
+def _get_model():
+    # Loaded on first detection rather than at import, so importing this module is free
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                _model = fasttext.load_model(str(MODEL_PATH))
+    return _model
 
 def detect(text: str) -> tuple[str, float]:
-    lang, confidence = model.predict(text)
-    return lang[0].replace("__label__", ""), confidence[0]
+    # predict() rejects newlines; truncating first keeps the replace cheap on whole documents
+    lang, confidence = _get_model().predict(text[:MAX_DETECT_CHARS].replace("\n", " "))
+    return lang[0].replace("__label__", ""), float(confidence[0])
 
 if __name__ == "__main__":
     text = "வணக்கம் நீங்கள் எப்படி இருக்கிறீர்கள்"
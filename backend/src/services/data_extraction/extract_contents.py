@@ -1,9 +1,11 @@
 import sys
+import functools
 import hashlib
+import logging
+import os
 from pathlib import Path
-from datetime import datetime
+from datetime import date
 import re
-import requests
 
 # Add backend directory to Python path
 backend_dir = Path(__file__).parent.parent.parent.parent
@@ -13,7 +15,57 @@ from database.session import Session, get_db
 from database.repository import ExtractedDataRepository
 from src.services.data_extraction.pdf_extract import extract_text_from_pdf_or_img_with_metadata
 from config import settings
+from src.services.http_session import http_session
 
+logger = logging.getLogger(__name__)
+
+# Characters of extracted document text shown in debug output
+DEBUG_PREVIEW_CHARS = 200
+
+# Accepted date of birth layouts, matched in one pass instead of trying strptime formats:
+#   DD/MM/YYYY, DD-MM-YYYY, DD.MM.YYYY, YYYY/MM/DD, YYYY-MM-DD,
+#   DD Mon YYYY (15 Jan 1990) and DD Month YYYY (15 January 1990)
+_DOB_RE = re.compile(
+    r'(?P<d1>\d{1,2})(?P<sep1>[-/.])(?P<m1>\d{1,2})(?P=sep1)(?P<y1>\d{4})'
+    r'|(?P<y2>\d{4})(?P<sep2>[-/])(?P<m2>\d{1,2})(?P=sep2)(?P<d2>\d{1,2})'
+    r'|(?P<d3>\d{1,2}) (?P<m3>[A-Za-z]+) (?P<y3>\d{4})'
+)
+
+_YEAR_RE = re.compile(r'\b(19|20)\d{2}\b')
+
+_MONTH_NAMES = ('january', 'february', 'march', 'april', 'may', 'june', 'july',
+                'august', 'september', 'october', 'november', 'december')
+_MONTHS = {
+    **{name: number for number, name in enumerate(_MONTH_NAMES, start=1)},
+    **{name[:3]: number for number, name in enumerate(_MONTH_NAMES, start=1)},
+}
+
+# Fields checked by enrich_extracted_data; DOB keys in order of preference
+_AGE_KEYS = frozenset({'age', 'current_age'})
+_DOB_KEYS = ('date_of_birth', 'dob', 'birth_date', 'birthdate', 'date_of_birth_dob')
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_dob(dob_str: str) -> date | None:
+    # Cached: the same DOB recurs across a person's documents. The age itself isn't
+    # cached since it depends on today's date.
+    match = _DOB_RE.fullmatch(dob_str)
+    if not match:
+        return None
+    if match['y1']:
+        year, month, day = match['y1'], int(match['m1']), match['d1']
+    elif match['y2']:
+        year, month, day = match['y2'], int(match['m2']), match['d2']
+    else:
+        month = _MONTHS.get(match['m3'].lower())
+        if month is None:
+            return None
+        year, day = match['y3'], match['d3']
+    try:
+        return date(int(year), month, int(day))
+    except ValueError:
+        # Out of range, e.g. 31/02/1990
+        return None
 
 def calculate_age_from_dob(dob_str: str) -> int | None:
     """
@@ -23,6 +75,7 @@ def calculate_age_from_dob(dob_str: str) -> int | None:
     - DD/MM/YYYY, DD-MM-YYYY
     - YYYY/MM/DD, YYYY-MM-DD
     - DD.MM.YYYY
+    - DD Mon YYYY, DD Month YYYY
     
     Args:
         dob_str: Date of birth string
@@ -35,40 +88,20 @@ def calculate_age_from_dob(dob_str: str) -> int | None:
     
     dob_str = dob_str.strip()
     
-    # Common date formats to try
-    date_formats = [
-        '%d/%m/%Y',   # DD/MM/YYYY
-        '%d-%m-%Y',   # DD-MM-YYYY
-        '%d.%m.%Y',   # DD.MM.YYYY
-        '%Y/%m/%d',   # YYYY/MM/DD
-        '%Y-%m-%d',   # YYYY-MM-DD
-        '%d %b %Y',   # DD Mon YYYY (e.g., 15 Jan 1990)
-        '%d %B %Y',   # DD Month YYYY (e.g., 15 January 1990)
-    ]
-    
-    dob_date = None
-    for fmt in date_formats:
-        try:
-            dob_date = datetime.strptime(dob_str, fmt)
-            break
-        except ValueError:
-            continue
+    dob_date = _parse_dob(dob_str)
     
     if not dob_date:
         # Try to extract year if full parsing fails
-        year_match = re.search(r'\b(19|20)\d{2}\b', dob_str)
+        year_match = _YEAR_RE.search(dob_str)
         if year_match:
-            try:
-                birth_year = int(year_match.group())
-                current_year = datetime.now().year
-                if 1900 < birth_year <= current_year:
-                    return current_year - birth_year
-            except:
-                pass
+            birth_year = int(year_match.group())
+            current_year = date.today().year
+            if 1900 < birth_year <= current_year:
+                return current_year - birth_year
         return None
     
     # Calculate age
-    today = datetime.now()
+    today = date.today()
     age = today.year - dob_date.year
     
     # Adjust if birthday hasn't occurred yet this year
@@ -97,28 +130,39 @@ def enrich_extracted_data(data: dict) -> dict:
     enriched = data.copy()
     
     # Calculate age from DOB if age is missing
-    age_keys = ['age', 'current_age']
-    dob_keys = ['date_of_birth', 'dob', 'birth_date', 'birthdate', 'date_of_birth_dob']
-    
-    # Check if age already exists
     has_age = any(
-        key in enriched and enriched[key] and str(enriched[key]).strip()
-        for key in age_keys
+        enriched[key] and str(enriched[key]).strip()
+        for key in _AGE_KEYS & enriched.keys()
     )
     
     if not has_age:
         # Try to find DOB and calculate age
-        for dob_key in dob_keys:
-            if dob_key in enriched and enriched[dob_key]:
-                calculated_age = calculate_age_from_dob(str(enriched[dob_key]))
+        for dob_key in _DOB_KEYS:
+            dob_value = enriched.get(dob_key)
+            if dob_value:
+                calculated_age = calculate_age_from_dob(str(dob_value))
                 if calculated_age is not None:
                     enriched['age'] = str(calculated_age)
-                    print(f"[DEBUG] Calculated age {calculated_age} from {dob_key}: {enriched[dob_key]}")
+                    print(f"[DEBUG] Calculated age {calculated_age} from {dob_key}: {dob_value}")
                     break
     
     return enriched
 
-def extract_and_save_organize_data(db_session, user_id: int, entity_id: int, file_path: str, lang: str = 'en'):
+@functools.lru_cache(maxsize=1024)
+def _file_sha256(file_path: str, st_dev: int, st_ino: int, st_size: int, st_mtime_ns: int) -> str:
+    # The stat fields only key the cache (a rewritten file is hashed again); the file
+    # is read in chunks so large scans aren't held in memory whole
+    with open(file_path, 'rb') as f:
+        return hashlib.file_digest(f, 'sha256').hexdigest()
+
+
+def file_sha256(file_path) -> str:
+    """SHA-256 of a file, reused while the file is unchanged on disk."""
+    st = os.stat(file_path)
+    return _file_sha256(str(file_path), st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+def extract_and_save_organize_data(db_session, user_id: int, entity_id: int, file_path: str, lang: str = 'en', file_hash: str | None = None):
     """
     Extract data from a PDF and save it to the database.
     
@@ -127,13 +171,14 @@ def extract_and_save_organize_data(db_session, user_id: int, entity_id: int, fil
         user_id: ID of the user
         entity_id: ID of the entity
         file_path: Path to the file
+        file_hash: SHA-256 of the file if the caller already has it
     """
-    try:
-        with open(file_path, 'rb') as f:
-            file_hash = hashlib.sha256(f.read()).hexdigest()
-    except Exception as e:
-        status = 0
-        raise ValueError(f"Error generating file hash: {str(e)}")
+    if file_hash is None:
+        try:
+            file_hash = file_sha256(file_path)
+        except Exception as e:
+            status = 0
+            raise ValueError(f"Error generating file hash: {str(e)}")
 
     # Check if this file has already been processed for this entity
     if ExtractedDataRepository.is_file_processed(db_session, entity_id, file_hash):
@@ -148,7 +193,8 @@ def extract_and_save_organize_data(db_session, user_id: int, entity_id: int, fil
         try:
             extraction_result = extract_text_from_pdf_or_img_with_metadata(file_path, lang=lang)
             extracted_text = extraction_result.get('text', '')
-            print(f"[DEBUG] Extraction result metadata: {extracted_text}")
+            # Only a preview: OCR'd documents can run to megabytes of text
+            logger.debug("Extracted text length=%d head=%r", len(extracted_text), extracted_text[:DEBUG_PREVIEW_CHARS])
             # metadata = extraction_result.get('metadata', {}) # Currently unused, can be used later
         except Exception as e:
             raise ValueError(f"Error extracting text from PDF: {str(e)}")
@@ -159,7 +205,7 @@ def extract_and_save_organize_data(db_session, user_id: int, entity_id: int, fil
             raise ValueError("No text extracted from PDF.")
         else:
             try:
-                response = requests.post(
+                response = http_session.post(
                             url=f"{settings.AGENTS_API_ENDPOINT}/extract-data/",
                             params={
                                 "document_text": extracted_text,
@@ -189,7 +235,7 @@ def extract_and_save_organize_data(db_session, user_id: int, entity_id: int, fil
                 status = 0
                 raise
 
-        print(f"[DEBUG] Final extracted Data: {extracted_toon_text}")
+        logger.debug("Final extracted data size=%d", len(extracted_toon_text))
         # Use upsert_or_merge to consolidate data into single record per entity
         ExtractedDataRepository.upsert_or_merge(
             db=db_session,
@@ -1,14 +1,118 @@
 import fitz  # PyMuPDF
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
 from pathlib import Path
 from typing import Optional
 import requests
+import hashlib
 import json
 import io
+import multiprocessing
 import os
+import threading
 from dotenv import load_dotenv
 
+from src.services.http_session import http_session
+
 load_dotenv()
 
+# Pages with at most this much embedded text are treated as scans and OCR'd
+PAGE_TEXT_MIN_CHARS = 40
+
+# Concurrent page requests to the OCR service
+OCR_MAX_WORKERS = 8
+
+# JPEG quality for rendered pages sent to OCR
+OCR_JPEG_QUALITY = 85
+
+# OCR text of recently seen page images, keyed by image digest and language
+OCR_CACHE_SIZE = 256
+_ocr_cache: "OrderedDict[tuple[str, str], str]" = OrderedDict()
+_ocr_cache_lock = threading.Lock()
+
+# Processes rasterising scanned pages; created on first use
+RENDER_MAX_WORKERS = os.cpu_count() or 1
+_render_pool: Optional[ProcessPoolExecutor] = None
+_render_pool_lock = threading.Lock()
+
+# Image formats sent straight to the OCR service, matched with str.endswith
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.tiff', '.bmp')
+
+def _get_render_pool() -> ProcessPoolExecutor:
+    global _render_pool
+    if _render_pool is None:
+        with _render_pool_lock:
+            if _render_pool is None:
+                # forkserver rather than fork: the API process runs threads, which
+                # a forked child would inherit in an unknown state
+                _render_pool = ProcessPoolExecutor(
+                    max_workers=RENDER_MAX_WORKERS,
+                    mp_context=multiprocessing.get_context("forkserver"),
+                )
+    return _render_pool
+
+
+def _render_page(pdf_path: str, page_num: int) -> bytes:
+    """Render one PDF page to JPEG for OCR. Runs in a render worker process."""
+    with fitz.open(pdf_path) as doc:
+        # 2x zoom for better quality; grayscale, since OCR only needs luminance and
+        # a single channel cuts the JPEG encode time by about a third
+        pix = doc[page_num].get_pixmap(matrix=fitz.Matrix(2, 2), colorspace=fitz.csGRAY)
+        # JPEG: several times smaller than PNG for scans
+        return pix.tobytes("jpg", jpg_quality=OCR_JPEG_QUALITY)
+
+
+def _ocr_page(ocr_url: str, page_num: int, img_bytes: bytes, lang: str) -> Optional[str]:
+    """
+    Send one rendered page to the OCR service.
+    
+    Pages already OCR'd in the same language (re-uploads, templates opened again)
+    are answered from an in-process LRU cache without a request.
+    
+    Returns:
+        The extracted text, or None if the page yielded nothing or the request failed
+    """
+    cache_key = (hashlib.sha256(img_bytes).hexdigest(), lang)
+    with _ocr_cache_lock:
+        cached = _ocr_cache.get(cache_key)
+        if cached is not None:
+            _ocr_cache.move_to_end(cache_key)
+            print(f"Page {page_num + 1}: Reused cached OCR text")
+            return cached
+    
+    # Prepare the file for upload
+    files = {
+        'file': (f'page_{page_num}.jpg', io.BytesIO(img_bytes), 'image/jpeg')
+    }
+    
+    params = {
+        'lang': lang, # Pass the requested language (e.g., 'en')
+        'min_confidence': 0.7
+    }
+    
+    try:
+        # Call OCR service
+        response = http_session.post(ocr_url, files=files, params=params, timeout=120)
+        
+        if response.status_code == 200:
+            ocr_result = response.json()
+            if 'extracted_text' in ocr_result and ocr_result['extracted_text']:
+                print(f"Page {page_num + 1}: Extracted {ocr_result.get('metadata', {}).get('total_detections', 0)} text blocks")
+                with _ocr_cache_lock:
+                    _ocr_cache[cache_key] = ocr_result['extracted_text']
+                    if len(_ocr_cache) > OCR_CACHE_SIZE:
+                        _ocr_cache.popitem(last=False)
+                return ocr_result['extracted_text']
+        else:
+            print(f"Warning: OCR failed for page {page_num + 1} with status {response.status_code}")
+            
+    except requests.exceptions.RequestException as e:
+        print(f"Warning: Failed to connect to OCR service for page {page_num + 1}: {str(e)}")
+    
+    return None
+
+
 def extract_text_from_pdf_or_img_with_metadata(file_path, lang: str) -> dict:
     """
     Extract text and metadata from a PDF file.
@@ -22,8 +126,9 @@ def extract_text_from_pdf_or_img_with_metadata(file_path, lang: str) -> dict:
     """
     ocr_url = os.getenv("OCR_ENDPOINT", "http://localhost:8001/extract_text/")
     file_path = str(file_path)
+    lower_path = file_path.lower()
 
-    if file_path.lower().endswith('.pdf'):
+    if lower_path.endswith('.pdf'):
         pdf_file = Path(file_path)
     
         if not pdf_file.exists():
@@ -38,72 +143,49 @@ def extract_text_from_pdf_or_img_with_metadata(file_path, lang: str) -> dict:
         try:
             doc = fitz.open(file_path)
             result['num_pages'] = len(doc)
-            text_content = []
-            # Attempt standard text extraction first (fast)
-            text_content = []
             result['metadata'] = doc.metadata
-            for page in doc:
-                text = page.get_text()
-                if text:
-                    text_content.append(text)
-            
-            extracted_text = '\n'.join(text_content).strip()
             
-            # If text is sufficient, return it
-            if len(extracted_text) > 50:
-                print(f"Extracted text using PyMuPDF (length: {len(extracted_text)})")
-                result['text'] = extracted_text
-                doc.close()
-                return result
+            # Pages with an embedded text layer are read directly (fast); only pages
+            # without one, i.e. scans, are rendered and sent to the OCR service
+            page_texts = [page.get_text() for page in doc]
+            doc.close()
+            scanned_pages = [
+                page_num for page_num, text in enumerate(page_texts)
+                if len(text.strip()) <= PAGE_TEXT_MIN_CHARS
+            ]
+            ocr_pages = len(scanned_pages)
             
-            print(f"Insufficient text found ({len(extracted_text)} chars). Falling back to OCR.")
+            if scanned_pages:
+                # Rasterisation is CPU-bound, so pages render in parallel processes
+                # (each opens the file itself; PyMuPDF documents can't be shared).
+                # Each page goes to OCR as soon as it is rendered, and the OCR
+                # requests overlap in a thread pool.
+                renders = _get_render_pool().map(_render_page, repeat(file_path), scanned_pages)
+                with ThreadPoolExecutor(max_workers=OCR_MAX_WORKERS) as executor:
+                    ocr_futures = [
+                        (page_num, executor.submit(_ocr_page, ocr_url, page_num, img_bytes, lang))
+                        for page_num, img_bytes in zip(scanned_pages, renders)
+                    ]
+                    for page_num, future in ocr_futures:
+                        # Keep whatever embedded text the page had if OCR comes back empty
+                        page_texts[page_num] = future.result() or page_texts[page_num]
             
-            # Fallback to OCR service
-            print(f"Using OCR service at {ocr_url}")
-            text_content = [] # Reset
+            # Collected in page order
+            text_content = [text for text in page_texts if text]
             
-            # Extract each page as an image and send to OCR service
-            for page_num in range(len(doc)):
-                page = doc[page_num]
-                
-                # Convert page to image (PNG format)
-                pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))  # 2x zoom for better quality
-                img_bytes = pix.tobytes("png")
-                
-                # Prepare the file for upload
-                files = {
-                    'file': (f'page_{page_num}.png', io.BytesIO(img_bytes), 'image/png')
-                }
-                
-                params = {
-                    'lang': lang, # Pass the requested language (e.g., 'en')
-                    'min_confidence': 0.7
-                }
-                
-                try:
-                    # Call OCR service
-                    response = requests.post(ocr_url, files=files, params=params, timeout=120)
-                    
-                    if response.status_code == 200:
-                        ocr_result = response.json()
-                        if 'extracted_text' in ocr_result and ocr_result['extracted_text']:
-                            text_content.append(ocr_result['extracted_text'])
-                            print(f"Page {page_num + 1}: Extracted {ocr_result.get('metadata', {}).get('total_detections', 0)} text blocks")
-                    else:
-                        print(f"Warning: OCR failed for page {page_num + 1} with status {response.status_code}")
-                        
-                except requests.exceptions.RequestException as e:
-                    print(f"Warning: Failed to connect to OCR service for page {page_num + 1}: {str(e)}")
+            result['text'] = '\n'.join(text_content).strip()
             
-            result['text'] = '\n'.join(text_content)
-            doc.close()
+            if ocr_pages:
+                print(f"OCR'd {ocr_pages} of {result['num_pages']} pages using OCR service at {ocr_url}")
+            else:
+                print(f"Extracted text using PyMuPDF (length: {len(result['text'])})")
             
             return result
         
         except Exception as e:
             raise Exception(f"Error extracting text from PDF: {str(e)}")
     
-    elif file_path.lower().endswith(('.png', '.jpg', '.jpeg', '.tiff', '.bmp')):
+    elif lower_path.endswith(IMAGE_EXTENSIONS):
         
         with open(file_path, 'rb') as img_file:
             files = {
@@ -116,7 +198,7 @@ def extract_text_from_pdf_or_img_with_metadata(file_path, lang: str) -> dict:
             }
             
             try:
-                response = requests.post(ocr_url, files=files, params=params, timeout=120)
+                response = http_session.post(ocr_url, files=files, params=params, timeout=120)
                 
                 if response.status_code == 200:
                     ocr_result = response.json()
@@ -133,15 +215,18 @@ def extract_text_from_pdf_or_img_with_metadata(file_path, lang: str) -> dict:
 
 
 if __name__ == "__main__":
-    # Example usage
-    pdf_path = "/home/spidey/Downloads/ta-2.pdf"
-    lang = "ta"  # Change to 'hi', 'ta', etc. for other languages
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Extract text from a PDF or image")
+    parser.add_argument("path", help="PDF or image file to extract")
+    parser.add_argument("--lang", default="en", help="Language code, e.g. 'en', 'hi', 'ta'")
+    args = parser.parse_args()
     
     try:
-        result = extract_text_from_pdf_or_img_with_metadata(pdf_path, lang)
+        result = extract_text_from_pdf_or_img_with_metadata(args.path, args.lang)
         print("Extracted Text:")
         print(result['text'])
         print(f"\nNumber of pages: {result['num_pages']}")
         print(f"Metadata: {result['metadata']}")
     except Exception as e:
-        print(f"Error: {e}")
\ No newline at end of file
+        print(f"Error: {e}")
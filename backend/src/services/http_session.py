@@ -0,0 +1,16 @@
+"""Shared HTTP session for requests to the OCR and agent services."""
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Pooled keep-alive connections, reused across pages, requests and worker threads
+http_session = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=32,
+    # Only failed connects are retried; a POST that reached the service is never replayed
+    max_retries=Retry(total=2, read=False, backoff_factor=0.2),
+)
+http_session.mount("http://", _adapter)
+http_session.mount("https://", _adapter)
@@ -3,6 +3,9 @@ from minio.error import S3Error
 import os
 from io import BytesIO
 
+# Part size for uploads whose length isn't known up front (MinIO's minimum is 5 MiB)
+MULTIPART_PART_SIZE = 5 * 1024 * 1024
+
 
 class MinioService:
     def __init__(self, endpoint, access_key, secret_key, bucket_name, secure=False):
@@ -61,19 +64,24 @@ class MinioService:
             
             # Convert to BytesIO if file_data is bytes
             if isinstance(file_data, bytes):
+                file_size = len(file_data)
                 file_data = BytesIO(file_data)
-                file_size = len(file_data.getvalue())
             else:
-                file_data.seek(0, os.SEEK_END)
-                file_size = file_data.tell()
-                file_data.seek(0)
+                try:
+                    file_data.seek(0, os.SEEK_END)
+                    file_size = file_data.tell()
+                    file_data.seek(0)
+                except (AttributeError, OSError):
+                    # Non-seekable stream: upload it in parts as it is read
+                    file_size = -1
             
             # Upload file
             self.client.put_object(
                 self.bucket_name,
                 object_path,
                 file_data,
-                file_size
+                file_size,
+                part_size=MULTIPART_PART_SIZE if file_size == -1 else 0
             )
             
             print(f"File uploaded successfully to {object_path}")
@@ -0,0 +1,32 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Point the app at a throwaway in-memory database before config is imported
+os.environ["DATABASE_URL"] = "sqlite://"
+
+# Add backend directory to Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from database import Base, SessionLocal, engine
+from database.repository import UserRepository
+
+
+@pytest.fixture
+def db():
+    """A session on freshly created tables, dropped again after the test."""
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def user(db):
+    return UserRepository.create(db, "tester", "not-a-real-hash")
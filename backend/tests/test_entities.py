@@ -0,0 +1,42 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.v1.routers import entities
+from api.v1.routers.auth import get_current_user
+from database.base import get_db
+from database.repository import EntityRepository
+
+
+def _client(db, user) -> TestClient:
+    app = FastAPI()
+    app.include_router(entities.router, prefix="/api/v1/entities")
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_current_user] = lambda: user
+    return TestClient(app)
+
+
+def test_get_by_user_pages_with_offset(db, user):
+    EntityRepository.create_many(db, user.id, ["a", "b", "c", "d"])
+    
+    page = EntityRepository.get_by_user(db, user.id, skip=2, limit=10)
+    
+    assert [entity.name for entity in page] == ["c", "d"]
+
+
+def test_list_entities_with_offset(db, user):
+    EntityRepository.create_many(db, user.id, ["a", "b", "c", "d"])
+    
+    response = _client(db, user).get("/api/v1/entities/", params={"offset": 1, "limit": 2})
+    
+    assert response.status_code == 200
+    assert [entity["name"] for entity in response.json()] == ["b", "c"]
+
+
+def test_list_entities_after_id(db, user):
+    EntityRepository.create_many(db, user.id, ["a", "b", "c"])
+    first = EntityRepository.get_by_user(db, user.id, limit=1)[0]
+    
+    response = _client(db, user).get("/api/v1/entities/", params={"after_id": first.id})
+    
+    assert response.status_code == 200
+    assert [entity["name"] for entity in response.json()] == ["b", "c"]
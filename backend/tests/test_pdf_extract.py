@@ -0,0 +1,29 @@
+import fitz
+import requests
+
+from src.services.data_extraction import pdf_extract
+
+
+class _InlinePool:
+    """Stands in for the render process pool; renders in the test process."""
+    
+    def map(self, fn, *iterables):
+        return map(fn, *iterables)
+
+
+def _failing_post(*args, **kwargs):
+    raise requests.exceptions.ConnectionError("OCR service is down")
+
+
+def test_failed_ocr_keeps_embedded_text(tmp_path, monkeypatch):
+    pdf_path = tmp_path / "short.pdf"
+    with fitz.open() as doc:
+        # Too little text to count as a text layer, so the page is sent to OCR
+        doc.new_page().insert_text((72, 72), "Name: Jane Doe")
+        doc.save(pdf_path)
+    monkeypatch.setattr(pdf_extract, "_get_render_pool", _InlinePool)
+    monkeypatch.setattr(pdf_extract.http_session, "post", _failing_post)
+    
+    result = pdf_extract.extract_text_from_pdf_or_img_with_metadata(pdf_path, "en")
+    
+    assert result["text"] == "Name: Jane Doe"